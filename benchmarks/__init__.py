@@ -0,0 +1,10 @@
+'''
+Benchmarks for html_generators
+
+Run from the root of the repository:
+python -m benchmarks [--output results.json] [--compare previous.json]
+
+Each benchmark case builds and renders a fresh tree on every iteration
+(trees are single-use, just like in real code). Cases that need Django are
+skipped when it isn't installed.
+'''
@@ -0,0 +1,58 @@
+import argparse
+import sys
+from . import runner
+from .cases import CASES
+
+def setup_django():
+	'''
+	Configure a minimal django project, if django is installed.
+	Returns True on success.
+	'''
+	try :
+		import django
+		from django.conf import settings
+	except ImportError :
+		return False
+	if not settings.configured :
+		settings.configure(
+			TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+		)
+		django.setup()
+	return True
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		prog='python -m benchmarks',
+		description='Benchmark html_generators against django templates and str.join baselines.',
+	)
+	parser.add_argument('cases', nargs='*', help='names or groups of cases to run (default: all)')
+	parser.add_argument('-n', '--number', type=int, default=20, help='renders per timing run')
+	parser.add_argument('-r', '--repeat', type=int, default=5, help='timing runs per case (best is reported)')
+	parser.add_argument('-o', '--output', help='save results to this JSON file')
+	parser.add_argument('-c', '--compare', help='compare to results previously saved with --output')
+	parser.add_argument('-l', '--list', action='store_true', help='list available cases and exit')
+	args = parser.parse_args(argv)
+
+	if args.list :
+		for name, (group, requires_django, _) in CASES.items() :
+			print(f'{group:<20} {name}{" (requires django)" if requires_django else ""}')
+		return
+
+	have_django = setup_django()
+	cases = {}
+	for name, (group, requires_django, function) in CASES.items() :
+		if args.cases and name not in args.cases and group not in args.cases :
+			continue
+		if requires_django and not have_django :
+			print(f'Skipping {name} (django is not installed)', file=sys.stderr)
+			continue
+		cases[name] = (group, function)
+
+	results = runner.run(cases, args.number, args.repeat)
+	previous = runner.load(args.compare) if args.compare else None
+	print(runner.report(results, previous))
+	if args.output :
+		runner.save(args.output, results)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,174 @@
+'''
+Benchmark cases
+
+Each case is a function which takes no arguments and returns the rendered
+html (as a str or bytes). Cases are registered with @case, and grouped so
+that related cases (ie. the same page, rendered by different engines) are
+reported next to each other.
+'''
+import html
+import html_generators as h
+
+CASES = {}
+
+def case(group, requires_django=False):
+	def register(function):
+		CASES[function.__name__] = (group, requires_django, function)
+		return function
+	return register
+
+BOOKS = [
+	dict(
+		id=i,
+		title=f'Book #{i} <& "friends">',
+		summary='A perfectly ordinary summary of a perfectly ordinary book. ' * 3,
+		published=i % 7 != 0,
+	)
+	for i in range(500)
+]
+
+# Deep nesting
+DEPTH = 200
+
+@case('deep_nesting')
+def deep_nesting():
+	tree = 'leaf'
+	for i in range(DEPTH) :
+		tree = h.Div(tree, class_='level')
+	return str(tree)
+
+@case('deep_nesting')
+def deep_nesting_str_join():
+	return ''.join(
+		['<div class="level">'] * DEPTH + ['leaf'] + ['</div>'] * DEPTH
+	)
+
+# Wide lists, built with Join
+@case('wide_join')
+def wide_join():
+	return str(h.Ul(h.Join(
+		'\n',
+		(h.Li(book['title'], data_id=book['id']) for book in BOOKS),
+	)))
+
+@case('wide_join')
+def wide_join_str_join():
+	return '<ul>' + '\n'.join(
+		f'<li data-id="{book["id"]}">{html.escape(book["title"])}</li>'
+		for book in BOOKS
+	) + '</ul>'
+
+# Attribute-heavy elements
+@case('attribute_heavy')
+def attribute_heavy():
+	return str(h.Form(
+		h.Input(
+			type='text',
+			name=f'field_{i}',
+			id=f'id_field_{i}',
+			value=book['title'],
+			placeholder='Enter a title',
+			required=True,
+			disabled=False,
+			maxlength=200,
+			class_='form-control',
+			data_index=i,
+		)
+		for i, book in enumerate(BOOKS)
+	))
+
+@case('attribute_heavy')
+def attribute_heavy_str_join():
+	return '<form>' + ''.join(
+		f'<input type="text" name="field_{i}" id="id_field_{i}" '
+		f'value="{html.escape(book["title"])}" placeholder="Enter a title" '
+		f'required maxlength="200" class="form-control" data-index="{i}">'
+		for i, book in enumerate(BOOKS)
+	) + '</form>'
+
+# template() substitution
+@case('template')
+def template():
+	return str(h.Fragment(
+		h.P(h.template(
+			'You have been paired with {partner}. Say hello to {partner} at {email}!',
+			partner=h.A(book['title'], href=f'/books/{book["id"]}/'),
+			email=h.Code('someone@example.com'),
+		))
+		for book in BOOKS
+	))
+
+# Large data tables
+@case('table')
+def table_elements():
+	return str(h.Table(h.Tbody(
+		h.Tr(h.Td(book['id']), h.Td(book['title']), h.Td(book['published']))
+		for book in BOOKS
+	)))
+
+@case('table')
+def table_from_rows():
+	return str(h.Table.from_rows(BOOKS, columns=['id', 'title', 'published']))
+
+@case('table')
+def table_str_join():
+	return '<table><tbody>' + ''.join(
+		f'<tr><td>{book["id"]}</td><td>{html.escape(book["title"])}</td><td>{book["published"]}</td></tr>'
+		for book in BOOKS
+	) + '</tbody></table>'
+
+# A full "book list" page, rendered in different ways
+def book_section(book):
+	return h.Section(
+		h.H2(book['title']),
+		h.P(book['summary']),
+		class_='book',
+		data_id=book['id'],
+	)
+
+def book_page():
+	return h.Document(
+		h.Head(
+			h.Title('My Books'),
+			h.Meta(charset='utf-8'),
+			h.Link(rel='stylesheet', href='/static/site.css'),
+		),
+		h.Body(
+			h.Nav(h.A('Home', href='/'), h.A('Books', href='/books/')),
+			h.Main(
+				h.H1('My Books'),
+				h.Join(h.Hr(), (
+					book_section(book) for book in BOOKS
+					if book['published']
+				)),
+			),
+		),
+	)
+
+BOOK_PAGE_TEMPLATE = '''<!DOCTYPE html>
+<head><title>My Books</title><meta charset="utf-8"><link rel="stylesheet" href="/static/site.css"></head><body><nav><a href="/">Home</a><a href="/books/">Books</a></nav><main><h1>My Books</h1>{% for book in books %}{% if not forloop.first %}<hr>{% endif %}<section class="book" data-id="{{book.id}}"><h2>{{book.title}}</h2><p>{{book.summary}}</p></section>{% endfor %}</main></body>'''
+
+@case('book_page')
+def book_page_str():
+	return str(book_page())
+
+@case('book_page', requires_django=True)
+def book_page_streaming_http_response():
+	from django.http import StreamingHttpResponse
+	return b''.join(StreamingHttpResponse(book_page()))
+
+@case('book_page', requires_django=True)
+def book_page_streaming_http_response_chunked():
+	from django.http import StreamingHttpResponse
+	return b''.join(StreamingHttpResponse(h.stream(book_page(), encoding='utf-8')))
+
+_django_template = None
+@case('book_page', requires_django=True)
+def book_page_django_template():
+	global _django_template
+	from django.template import Context, Template
+	if _django_template is None :
+		_django_template = Template(BOOK_PAGE_TEMPLATE)
+	return _django_template.render(Context(dict(
+		books=[book for book in BOOKS if book['published']],
+	)))
@@ -0,0 +1,56 @@
+'''
+Per-node memory usage
+
+python -m benchmarks.memory
+
+Builds many instances of each node type (and keeps them alive), and reports
+the average number of bytes allocated per instance, as measured by
+tracemalloc. This includes everything the node allocates (ie. its attrs
+dict), but not its children.
+'''
+import gc
+import tracemalloc
+import html_generators as h
+
+COUNT = 10000
+CHILD = 'child'
+
+NODES = {
+	'Element (no attrs)': lambda: h.Div(CHILD),
+	'Element (2 attrs)': lambda: h.Div(CHILD, class_='a', id='b'),
+	'Element.with_classes()': lambda: h.Div(CHILD, class_='a').with_classes('b'),
+	'VoidElement': lambda: h.Br(),
+	'RawTextElement': lambda: h.Script(CHILD),
+	'Fragment': lambda: h.Fragment(CHILD),
+	'Join': lambda: h.Join(CHILD, ()),
+	'MarkSafe': lambda: h.MarkSafe(CHILD),
+	'Comment': lambda: h.Comment(CHILD),
+	'Document': lambda: h.Document(CHILD),
+	'template': lambda: h.template(CHILD),
+}
+
+def bytes_per_node(factory):
+	factory() # warm up any caches
+	gc.collect()
+	tracemalloc.start()
+	try :
+		before, _ = tracemalloc.get_traced_memory()
+		nodes = [factory() for _ in range(COUNT)]
+		after, _ = tracemalloc.get_traced_memory()
+	finally :
+		tracemalloc.stop()
+	# Don't count the list itself
+	list_size = nodes.__sizeof__()
+	del nodes
+	return (after - before - list_size) / COUNT
+
+def main():
+	results = {name: bytes_per_node(factory) for name, factory in NODES.items()}
+	print(f'{"node":<25} {"bytes/node":>10}')
+	print('-' * 36)
+	for name, size in results.items() :
+		print(f'{name:<25} {size:>10.1f}')
+	return results
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,112 @@
+'''
+Measurement and reporting
+'''
+import gc
+import json
+import platform
+import time
+import tracemalloc
+
+def measure(function, number, repeat):
+	'''
+	Measure a single case.
+
+	Throughput is taken from the fastest of "repeat" runs of "number" calls.
+	Memory is measured separately, for a single call, with tracemalloc
+	enabled (tracemalloc slows everything down, so we don't time those calls).
+	'''
+	output = function()
+	best = float('inf')
+	for _ in range(repeat) :
+		gc.collect()
+		start = time.perf_counter()
+		for _ in range(number) :
+			function()
+		best = min(best, (time.perf_counter() - start) / number)
+
+	gc.collect()
+	tracemalloc.start()
+	try :
+		before = tracemalloc.take_snapshot()
+		baseline, _ = tracemalloc.get_traced_memory()
+		# Python 3.9+. Before that, peak also includes taking the snapshot above.
+		if hasattr(tracemalloc, 'reset_peak') :
+			tracemalloc.reset_peak()
+		result = function()
+		current, peak = tracemalloc.get_traced_memory()
+		after = tracemalloc.take_snapshot()
+	finally :
+		tracemalloc.stop()
+	allocations = sum(
+		stat.count_diff for stat in after.compare_to(before, 'filename')
+		if stat.count_diff > 0
+	)
+	del result
+
+	return dict(
+		seconds_per_render=best,
+		renders_per_second=1 / best,
+		output_bytes=len(output if isinstance(output, bytes) else output.encode()),
+		# Memory blocks still allocated after the render (mostly the output)
+		retained_allocations=allocations,
+		retained_bytes=current - baseline,
+		# Highest memory usage during the render, above what was in use before
+		peak_bytes=peak - baseline,
+	)
+
+def run(cases, number, repeat):
+	return {
+		name: dict(group=group, **measure(function, number, repeat))
+		for name, (group, function) in cases.items()
+	}
+
+def environment():
+	import html_generators
+	import os
+	version_file = os.path.join(os.path.dirname(html_generators.__file__), 'VERSION')
+	try :
+		with open(version_file) as f :
+			version = f.read().strip()
+	except OSError :
+		version = None
+	return dict(
+		html_generators=version,
+		python=platform.python_version(),
+		implementation=platform.python_implementation(),
+		machine=platform.machine(),
+		timestamp=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+	)
+
+def save(path, results):
+	with open(path, 'w') as f :
+		json.dump(dict(environment=environment(), results=results), f, indent=2)
+
+def load(path):
+	with open(path) as f :
+		return json.load(f)['results']
+
+def report(results, previous=None):
+	lines = []
+	header = f'{"case":<40} {"renders/s":>11} {"ms/render":>10} {"peak KiB":>9} {"retained":>9}'
+	if previous :
+		header += f' {"vs prev":>8}'
+	lines.append(header)
+	lines.append('-' * len(header))
+	group = None
+	for name, result in sorted(results.items(), key=lambda item: item[1]['group']) :
+		if result['group'] != group :
+			if group is not None :
+				lines.append('')
+			group = result['group']
+		line = (
+			f'{name:<40} '
+			f'{result["renders_per_second"]:>11.1f} '
+			f'{result["seconds_per_render"] * 1000:>10.3f} '
+			f'{result["peak_bytes"] / 1024:>9.1f} '
+			f'{result["retained_allocations"]:>9}'
+		)
+		if previous and name in previous :
+			ratio = previous[name]['seconds_per_render'] / result['seconds_per_render']
+			line += f' {ratio:>7.2f}x'
+		lines.append(line)
+	return '\n'.join(lines)
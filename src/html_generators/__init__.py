@@ -2,33 +2,98 @@
 html_generators - functional html generation
 
 Note - all of our submodules (with the exception)
+
+Only the core classes are imported eagerly. Everything else (including the
+standard element classes) is imported on first use (see PEP 562), to keep
+startup fast for short-lived processes.
 '''
-from ._base import Content
-from ._document import Document  # noqa
+import os
+from ._base import Content, register_content_type  # noqa
 from ._element import Element  # noqa
-from ._standard_elements import *  # noqa
-from ._standard_elements import __all__ as _all_elements
-from ._comment import Comment  # noqa
-from ._format import format  # noqa
 from ._fragment import Fragment  # noqa
 from ._join import Join  # noqa
 from ._mark_safe import MarkSafe  # noqa
-from ._template import template # noqa
-from ._utils import classes, styles  # noqa
+from ._standard_elements import __all__ as _all_elements
+
+# Attribute name -> submodule which defines it
+_lazy = {
+	'render_many': '_batch',
+	'Cached': '_cached',
+	'CacheBackend': '_cached',
+	'LRUCache': '_cached',
+	'default_cache': '_cached',
+	'Deferred': '_deferred',
+	'Diff': '_diff',
+	'render_diff': '_diff',
+	'Document': '_document',
+	'Comment': '_comment',
+	'compile': '_compile',
+	'format': '_format',
+	'Limited': '_limits',
+	'RenderLimitExceeded': '_limits',
+	'Memo': '_memo',
+	'Parallel': '_parallel',
+	'Rows': '_rows',
+	'profile': '_profile',
+	'Profile': '_profile',
+	'ProfileStats': '_profile',
+	'stream': '_stream',
+	'astream': '_stream',
+	'template': '_template',
+	'classes': '_utils',
+	'styles': '_utils',
+	**{name: '_standard_elements' for name in _all_elements},
+}
+
+def __getattr__(name):
+	try :
+		module = _lazy[name]
+	except KeyError :
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+	# Not importlib.import_module(), so that -X importtime reports it
+	value = getattr(__import__(module, globals(), level=1, fromlist=(name,)), name)
+	globals()[name] = value
+	return value
+
+def __dir__():
+	return sorted(set(globals()) | set(_lazy))
+
+if os.environ.get('HTML_GENERATORS_PROFILE') :
+	# Must start before anything is rendered
+	from . import _profile  # noqa
 
 # This is for pydoc support, not for "import *" support (which we don't recommend)
 __all__ = [
 	'Content',
+	'register_content_type',
+	'render_many',
+	'render_diff',
+	'Diff',
+	'Cached',
+	'CacheBackend',
+	'LRUCache',
+	'default_cache',
+	'Deferred',
 	'Document',
 	'Element',
 	'Comment',
+	'compile',
 	'Fragment',
 	'format',
 	'Join',
+	'Limited',
+	'RenderLimitExceeded',
 	'MarkSafe',
+	'Memo',
+	'Parallel',
+	'profile',
+	'Profile',
+	'ProfileStats',
+	'Rows',
+	'stream',
+	'astream',
     'template',
 	'classes',
 	'styles',
 	*_all_elements,
 ]
-
@@ -1,5 +1,7 @@
-from html import escape
-from typing import Any, Iterable, Iterator
+import io
+import types
+from ._escape import escape
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Tuple
 
 #: type alias; content that is intended to be passed to an HTMLGenerator
 #: see generate_child_html to understand how different types will be rendered
@@ -14,6 +16,8 @@ class SafeString(str):
 	- django.utils.html.conditional_escape
 	- markupsafe.escape/markupsafe.Markup.format
 	'''
+	__slots__ = ()
+
 	def __html__(self) -> str:
 		return self
 
@@ -23,7 +27,13 @@ class HTMLGenerator:
 
 	This is the base class for all of our public classes.
 	It is not intended to be used directly by end users.
+
+	Subclasses should implement either _render_parts() or __iter__().
+
+	All of our subclasses use __slots__, since large trees may be built 
+	before rendering. Third-party subclasses don't need to.
 	'''
+	__slots__ = ()
 
 	def __iter__(self) -> Iterator[str]:
 		'''
@@ -32,9 +42,55 @@ class HTMLGenerator:
 		Generally, users will be casting/coercing HTMLGenerators to str, but
 		their iterable nature is sometimes useful. For example, you can pass
 		them directly to django.http.StreamingHttpResponse().
+
+		Subclasses may override this, and call super().__iter__() to
+		generate their usual html.
+		'''
+		if type(self).__iter__ is not _default_iter :
+			# Called via super() - walking self would call the override again
+			return _generate_own_html(self)
+		return generate_child_html(self)
+
+	def _render_parts(self) -> Tuple[str, Iterable[Content], str]:
+		'''
+		Return (opening html, children, closing html).
+
+		This lets our renderers walk the tree without recursion (and without
+		nesting one generator inside another for every level of the tree).
+		Only called if __iter__ is not overridden.
 		'''
 		raise NotImplementedError()
 
+	def _arender_parts(self) -> Tuple[str, Iterable[Content], str]:
+		'''
+		Like _render_parts(), but used when rendering asynchronously.
+		'''
+		return self._render_parts()
+
+	def _render_stateful_parts(self, state: dict) -> Tuple[str, Iterable[Content], str]:
+		'''
+		Like _render_parts(), but state is a dict which is shared by the
+		whole render (one call of one of our walkers), for nodes which need
+		to cooperate with other nodes in the same render (ie. Deferred and
+		Body). Each such node chooses its own keys.
+
+		If overridden, this is used instead of _render_parts() and
+		_arender_parts() by every walker.
+		'''
+		return self._render_parts()
+
+	def _render_into(self, out: List[str]) -> None:
+		'''
+		Append our html to out.
+
+		Optional. Leaf nodes (which have no children for the walker to visit)
+		override this, so render_child_html() can append their html directly,
+		rather than opening (and closing) a level of its stack for them.
+		Nodes which override it must still implement _render_parts(), which
+		is used when streaming.
+		'''
+		render_child_html(self, out)
+
 	'''
 	Note:
 	__html__() allows us to be passed directly to markupsafe.Markup, 
@@ -63,57 +119,650 @@ class HTMLGenerator:
 		The returned str is a SafeString, which won't be escaped when passed
 		to django templates or markupsafe.
 		'''
-		return SafeString(''.join(iter(self)))
+		out = []
+		render_child_html(self, out)
+		return SafeString(''.join(out))
 
-def generate_child_html(child: Content) -> Iterator[str]:
+	def render_bytes(self, encoding: str = 'utf-8') -> bytes:
+		'''
+		Like str(self).encode(encoding), but without building the 
+		intermediate str.
+		'''
+		# Imported here to avoid circular import
+		from ._stream import incremental_encoder
+		encode = incremental_encoder(encoding)
+		out = []
+		render_child_html(self, out)
+		# Encode in batches, so we never hold the entire document as both str and bytes
+		encoded = [
+			encode(''.join(out[i:i+_ENCODE_BATCH]))
+			for i in range(0, len(out), _ENCODE_BATCH)
+		]
+		encoded.append(encode('', True))
+		return b''.join(encoded)
+
+	def write_to(
+		self, 
+		fp: Any, 
+		encoding: str = 'utf-8', 
+		buffer_size: int = 8192,
+	) -> None:
+		'''
+		Write our html to a file, in chunks of roughly buffer_size characters.
+
+		Memory use is bounded by buffer_size (plus whatever your own 
+		generators hold on to), so this is suitable for very large documents.
+
+		fp may be:
+		- a text file (any io.TextIOBase, ie. open(path, 'w') or io.StringIO)
+		- a socket (anything with sendall())
+		- a binary file (anything else with write(), ie. open(path, 'wb'), 
+		io.BufferedWriter, io.BytesIO)
+		Strings are encoded with encoding, unless fp is a text file.
+		'''
+		# Imported here to avoid circular import
+		from ._stream import stream
+		if isinstance(fp, io.TextIOBase) :
+			write = fp.write
+			encoding = None
+		elif hasattr(fp, 'sendall') :
+			write = fp.sendall
+		else :
+			write = fp.write
+		for chunk in stream(self, buffer_size, encoding) :
+			write(chunk)
+
+	def materialize(self) -> 'HTMLGenerator':
+		'''
+		Wrap self, so that it can be rendered more than once.
+		See Memo.
+		'''
+		# Imported here to avoid circular import
+		from ._memo import Memo
+		return Memo(self)
+
+	def __aiter__(self) -> AsyncIterator[str]:
+		'''
+		Asynchronously generate a sequence of HTML strings.
+
+		Unlike __iter__, this supports awaitables (ie. coroutines) and
+		async iterables (ie. async generators) as children, anywhere in the
+		tree. Each is awaited/iterated only when we reach it in the document.
+		'''
+		type_ = type(self)
+		if type_.__iter__ is not _default_iter and type_.__aiter__ is not _default_aiter :
+			# Called via super() (see __iter__)
+			return _agenerate_own_html(self)
+		return agenerate_child_html(self)
+
+	async def arender(self) -> SafeString:
+		'''
+		Like str(), but supports awaitables and async iterables as children.
+		'''
+		out = []
+		async for html in agenerate_child_html(self) :
+			out.append(html)
+		return SafeString(''.join(out))
+
+_ENCODE_BATCH = 1024
+_default_iter = HTMLGenerator.__iter__
+_default_aiter = HTMLGenerator.__aiter__
+_default_render_into = HTMLGenerator._render_into
+_default_render_stateful_parts = HTMLGenerator._render_stateful_parts
+
+'''
+How each type of child is rendered.
+
+The "kinds" below are compared by identity, in the render loops.
+_child_kinds caches the kind of every type we've seen, so that most children
+cost a single dict lookup. _classify() decides the kind of new types.
+'''
+_SKIP = 0 # None/False
+_TEXT = 1 # str -> escape
+_PARTS = 2 # HTMLGenerator using _render_parts()
+_ITERABLE = 3 # render each item
+_PLAIN = 4 # str(child) never needs escaping (ie. int)
+_HTML = 5 # has __html__()
+_SAFE = 6 # our own SafeString
+_BOOL = 7 # False is skipped, True renders as "True"
+_STRINGIFY = 8 # escape(str(child))
+_CUSTOM_ITER = 9 # HTMLGenerator with its own __iter__()
+_CONVERT = 10 # registered via register_content_type()
+_AWAITABLE = 11 # only supported by agenerate_child_html
+_ASYNC_ITERABLE = 12 # only supported by agenerate_child_html
+_INTO = 13 # HTMLGenerator with its own _render_into() (streamed like _PARTS)
+_STATEFUL = 14 # HTMLGenerator using _render_stateful_parts()
+
+_child_kinds = {
+	type(None): _SKIP,
+	bool: _BOOL,
+	str: _TEXT,
+	SafeString: _SAFE,
+	int: _PLAIN,
+	float: _PLAIN,
+	list: _ITERABLE,
+	tuple: _ITERABLE,
+	type(x for x in ()): _ITERABLE,
+}
+_converters = {}
+
+# Other types whose str() never needs escaping.
+# Identified by name, so we don't have to import their modules.
+_plain_types = {
+	('decimal', 'Decimal'),
+	('datetime', 'date'),
+	('datetime', 'datetime'),
+	('datetime', 'time'),
+}
+
+def register_content_type(type_: type, convert: Callable[[Any], Content]) -> None:
 	'''
-	Generate a sequence of HTML strings from the given object.
+	Render instances of type_ by rendering convert(instance) instead.
 
-	The sequence of strings, as a whole, will be a balanced HTML fragment.
+	Ie:
+	h.register_content_type(Money, lambda m: h.Span(m.amount, class_='money'))
+
+	Only applies to instances of exactly type_ (not subclasses).
+	'''
+	_converters[type_] = convert
+	_child_kinds[type_] = _CONVERT
+
+def _classify(child: Content) -> int:
+	'''
+	Determine how to render child, and cache the result for its type
+	(when the type alone determines the result).
 
 	We can't really describe the behaviour of this function any more 
 	concisely than the code does, so just read the code.
 	'''
+	type_ = type(child)
 
-	# use case: "conditional children"
-	# ie: h.Div(some_test() and 'A conditional child')
-	# Do _not_ just check "if child" - h.Div(0) should render <div>0</div>
-	if child is None or child is False :
-		return
+	# Objects which compute attributes dynamically may or may not have 
+	# __html__/__iter__, so we can't cache anything about them
+	cacheable = (
+		getattr(type_, '__getattr__', None) is None and
+		type_.__getattribute__ is object.__getattribute__
+	)
 
 	# Many children will be other (nested) HTMLGenerators
-	# Do _not_ call str(child) -> yield directly from it, so that HTML is generated "in order", and we only do string joining at the outer-most level
+	# Do _not_ call str(child) -> generate directly from it, so that HTML is generated "in order", and we only do string joining at the outer-most level
 	if isinstance(child, HTMLGenerator):
-		yield from child
-		return
-
+		if type_.__iter__ is not _default_iter :
+			kind = _CUSTOM_ITER
+		elif type_._render_stateful_parts is not _default_render_stateful_parts :
+			kind = _STATEFUL
+		elif type_._render_into is not _default_render_into :
+			kind = _INTO
+		else :
+			kind = _PARTS
 	# Support "Safe Strings" from other libraries (ie. Django) that implement __html__ method
 	# This allows you to use existing template tag/filter functions without wrapping the output in MarkSafe()
+	elif _has_html_method(child):
+		kind = _HTML
+	# Look for strings _before_ looking for other iterables, since strings are iterable, too
+	elif isinstance(child, str):
+		kind = _TEXT
+	# Coroutines, tasks, futures, etc.
+	# Check before __iter__, since asyncio.Future also implements __iter__
+	elif getattr(type_, '__await__', None) is not None :
+		kind = _AWAITABLE
+	# If it's iterable, generate html for each of its items
+	# Could be a tuple, list, generator expression, etc.
+	elif getattr(type_, '__iter__', None) is not None :
+		kind = _ITERABLE
+	elif hasattr(type_, '__getitem__'):
+		# Old-style sequence protocol. Only iter() can tell us.
+		cacheable = False
+		try :
+			iter(child)
+		except TypeError :
+			kind = _STRINGIFY
+		else :
+			kind = _ITERABLE
+	elif getattr(type_, '__aiter__', None) is not None :
+		kind = _ASYNC_ITERABLE
+	elif (type_.__module__, type_.__qualname__) in _plain_types :
+		kind = _PLAIN
+	else :
+		kind = _STRINGIFY
+
+	if cacheable :
+		_child_kinds[type_] = kind
+	return kind
+
+def _has_html_method(child):
 	try :
-		html_method = child.__html__
+		child.__html__
 	except (AttributeError, TypeError):
-		pass
-	else :
-		yield html_method()
+		return False
+	return True
+
+'''
+Note:
+generate_child_html, render_child_html, walk_child_html and agenerate_child_html
+implement the same algorithm. The first one streams, the second one appends to
+a list (which is quite a bit faster, when you're going to join everything
+anyway), the third one calls hooks (for instrumented renders), and the last
+one supports async children. Keep them in sync!
+
+Rather than recursing, they keep an explicit stack of (iterator of children,
+closing html) - one entry for each level of the tree that is currently open.
+Only render_child_html uses _render_into() - the others treat _INTO like _PARTS.
+
+While a profile is active (see _profile.py), the sync walkers hand over to
+an instrumented copy instead.
+'''
+
+_profiler = None
+
+def generate_child_html(child: Content) -> Iterator[str]:
+	'''
+	Generate a sequence of HTML strings from the given object.
+
+	The sequence of strings, as a whole, will be a balanced HTML fragment.
+	See _classify() for how each type of object is rendered.
+	'''
+	if _profiler is not None :
+		yield from _profiler.generate(child)
 		return
+	get_kind = _child_kinds.get
+	stack = []
+	children = iter((child,))
+	close = ''
+	state = None
+	while True :
+		for child in children :
+			kind = get_kind(type(child))
+			if kind is None :
+				kind = _classify(child)
 
-	# Look for strings _before_ looking for other iterables, since strings are iterable, too
-	if isinstance(child, str):
-		yield escape(child)
+			if kind is _TEXT :
+				yield escape(child)
+			elif kind is _PARTS or kind is _INTO :
+				open_html, grandchildren, close_html = child._render_parts()
+				if open_html :
+					yield open_html
+				stack.append((children, close))
+				children = iter(grandchildren)
+				close = close_html
+				break
+			elif kind is _SKIP :
+				continue
+			elif kind is _ITERABLE :
+				stack.append((children, close))
+				children = iter(child)
+				close = ''
+				break
+			elif kind is _PLAIN :
+				yield str(child)
+			elif kind is _SAFE :
+				yield child
+			elif kind is _HTML :
+				yield child.__html__()
+			elif kind is _BOOL :
+				# use case: "conditional children"
+				# ie: h.Div(some_test() and 'A conditional child')
+				# Do _not_ just check "if child" - h.Div(0) should render <div>0</div>
+				if child :
+					yield 'True'
+			elif kind is _STRINGIFY :
+				yield escape(str(child))
+			elif kind is _CUSTOM_ITER :
+				yield from child
+			elif kind is _CONVERT :
+				stack.append((children, close))
+				children = iter((_converters[type(child)](child),))
+				close = ''
+				break
+			elif kind is _STATEFUL :
+				if state is None :
+					state = {}
+				open_html, grandchildren, close_html = child._render_stateful_parts(state)
+				if open_html :
+					yield open_html
+				stack.append((children, close))
+				children = iter(grandchildren)
+				close = close_html
+				break
+			else :
+				_reject_async(child)
+		else :
+			if close :
+				yield close
+			if not stack :
+				return
+			children, close = stack.pop()
+
+def render_child_html(child: Content, out: List[str]) -> None:
+	'''
+	Like generate_child_html, but append the strings to out.
+	'''
+	if _profiler is not None :
+		out.extend(_profiler.generate(child))
 		return
-	# If it's iterable, generate html for each of its items
-	# Could be a tuple, list, generator expression, etc.
+	append = out.append
+	get_kind = _child_kinds.get
+	stack = []
+	children = iter((child,))
+	close = ''
+	state = None
+	while True :
+		for child in children :
+			kind = get_kind(type(child))
+			if kind is None :
+				kind = _classify(child)
+
+			if kind is _TEXT :
+				append(escape(child))
+			elif kind is _PARTS :
+				open_html, grandchildren, close_html = child._render_parts()
+				if open_html :
+					append(open_html)
+				stack.append((children, close))
+				children = iter(grandchildren)
+				close = close_html
+				break
+			elif kind is _INTO :
+				child._render_into(out)
+			elif kind is _SKIP :
+				continue
+			elif kind is _ITERABLE :
+				stack.append((children, close))
+				children = iter(child)
+				close = ''
+				break
+			elif kind is _PLAIN :
+				append(str(child))
+			elif kind is _SAFE :
+				append(child)
+			elif kind is _HTML :
+				append(child.__html__())
+			elif kind is _BOOL :
+				if child :
+					append('True')
+			elif kind is _STRINGIFY :
+				append(escape(str(child)))
+			elif kind is _CUSTOM_ITER :
+				out.extend(child)
+			elif kind is _CONVERT :
+				stack.append((children, close))
+				children = iter((_converters[type(child)](child),))
+				close = ''
+				break
+			elif kind is _STATEFUL :
+				if state is None :
+					state = {}
+				open_html, grandchildren, close_html = child._render_stateful_parts(state)
+				if open_html :
+					append(open_html)
+				stack.append((children, close))
+				children = iter(grandchildren)
+				close = close_html
+				break
+			else :
+				_reject_async(child)
+		else :
+			if close :
+				append(close)
+			if not stack :
+				return
+			children, close = stack.pop()
+
+def _no_hook(value=None):
+	return None
+
+def walk_child_html(
+	child: Content,
+	on_open: Callable[[Any], Any] = _no_hook,
+	on_emit: Callable[[str], None] = _no_hook,
+	on_close: Callable[[Any], None] = _no_hook,
+	on_skip: Callable[[Any], None] = _no_hook,
+) -> Iterator[str]:
+	'''
+	Like generate_child_html, but calls hooks as it goes. Slower, so only
+	used for instrumented renders (see Limited, render_diff() and profile()).
+
+	on_open(node) is called before each level of the tree is rendered.
+	node is the HTMLGenerator, or None for an iterable (or a value converted
+	via register_content_type()). Whatever it returns is passed to
+	on_close() once that level (including its closing html) is done, or
+	when rendering stops part way through.
+	on_emit(html) is called with each string, before it is yielded.
+	on_skip(child) is called with each child which renders nothing
+	(None/False), so that even those can be counted.
+
+	Stack entries also record the value returned by on_open().
+	'''
+	get_kind = _child_kinds.get
+	stack = []
+	children = iter((child,))
+	close = ''
+	level = _ROOT
+	state = None
 	try :
-		i = iter(child)
-	except TypeError :
-		pass
-	else :
-		for grandchild in i :
-			yield from generate_child_html(grandchild)
-		return
+		while True :
+			for child in children :
+				kind = get_kind(type(child))
+				if kind is None :
+					kind = _classify(child)
+
+				if kind is _TEXT :
+					html = escape(child)
+					on_emit(html)
+					yield html
+				elif kind is _PARTS or kind is _INTO :
+					opened = on_open(child)
+					stack.append((children, close, level))
+					level = opened
+					open_html, grandchildren, close_html = child._render_parts()
+					if open_html :
+						on_emit(open_html)
+						yield open_html
+					children = iter(grandchildren)
+					close = close_html
+					break
+				elif kind is _SKIP :
+					on_skip(child)
+				elif kind is _ITERABLE or kind is _CONVERT :
+					opened = on_open(None)
+					stack.append((children, close, level))
+					level = opened
+					children = iter((_converters[type(child)](child),) if kind is _CONVERT else child)
+					close = ''
+					break
+				elif kind is _PLAIN :
+					html = str(child)
+					on_emit(html)
+					yield html
+				elif kind is _SAFE :
+					on_emit(child)
+					yield child
+				elif kind is _HTML :
+					html = child.__html__()
+					on_emit(html)
+					yield html
+				elif kind is _BOOL :
+					if child :
+						on_emit('True')
+						yield 'True'
+					else :
+						on_skip(child)
+				elif kind is _STRINGIFY :
+					html = escape(str(child))
+					on_emit(html)
+					yield html
+				elif kind is _STATEFUL :
+					if state is None :
+						state = {}
+					opened = on_open(child)
+					stack.append((children, close, level))
+					level = opened
+					open_html, grandchildren, close_html = child._render_stateful_parts(state)
+					if open_html :
+						on_emit(open_html)
+						yield open_html
+					children = iter(grandchildren)
+					close = close_html
+					break
+				elif kind is _CUSTOM_ITER :
+					custom_level = on_open(child)
+					try :
+						for html in child :
+							on_emit(html)
+							yield html
+					finally :
+						on_close(custom_level)
+				else :
+					_reject_async(child)
+			else :
+				if close :
+					on_emit(close)
+					yield close
+				if not stack :
+					return
+				on_close(level)
+				children, close, level = stack.pop()
+	finally :
+		# Rendering was abandoned (or raised) part way through
+		if level is not _ROOT :
+			on_close(level)
+			for entry in reversed(stack) :
+				if entry[2] is not _ROOT :
+					on_close(entry[2])
+
+_ROOT = object()
+
+async def agenerate_child_html(child: Content) -> AsyncIterator[str]:
+	'''
+	Like generate_child_html, but awaitables and async iterables are allowed
+	anywhere in the tree.
+
+	Stack entries also record whether the iterator is async.
+	'''
+	get_kind = _child_kinds.get
+	stack = []
+	children = iter((child,))
+	is_async = False
+	close = ''
+	state = None
+	while True :
+		if is_async :
+			try :
+				child = await children.__anext__()
+			except StopAsyncIteration :
+				child = _DONE
+		else :
+			child = next(children, _DONE)
+		if child is _DONE :
+			if close :
+				yield close
+			if not stack :
+				return
+			children, is_async, close = stack.pop()
+			continue
+
+		kind = get_kind(type(child))
+		if kind is None :
+			kind = _classify(child)
+
+		if kind is _TEXT :
+			yield escape(child)
+		elif kind is _PARTS or kind is _INTO :
+			open_html, grandchildren, close_html = child._arender_parts()
+			if open_html :
+				yield open_html
+			stack.append((children, is_async, close))
+			children = iter(grandchildren)
+			is_async = False
+			close = close_html
+		elif kind is _SKIP :
+			continue
+		elif kind is _ITERABLE :
+			stack.append((children, is_async, close))
+			# Prefer async iteration, when both are supported (ie. Django QuerySets)
+			if hasattr(type(child), '__aiter__') :
+				children = child.__aiter__()
+				is_async = True
+			else :
+				children = iter(child)
+				is_async = False
+			close = ''
+		elif kind is _PLAIN :
+			yield str(child)
+		elif kind is _SAFE :
+			yield child
+		elif kind is _HTML :
+			yield child.__html__()
+		elif kind is _BOOL :
+			if child :
+				yield 'True'
+		elif kind is _STRINGIFY :
+			yield escape(str(child))
+		elif kind is _CUSTOM_ITER :
+			if type(child).__aiter__ is _default_aiter :
+				for html in child :
+					yield html
+			else :
+				async for html in child :
+					yield html
+		elif kind is _STATEFUL :
+			if state is None :
+				state = {}
+			open_html, grandchildren, close_html = child._render_stateful_parts(state)
+			if open_html :
+				yield open_html
+			stack.append((children, is_async, close))
+			children = iter(grandchildren)
+			is_async = False
+			close = close_html
+		elif kind is _AWAITABLE :
+			# Render the result in place of child
+			stack.append((children, is_async, close))
+			children = iter((await child,))
+			is_async = False
+			close = ''
+		elif kind is _ASYNC_ITERABLE :
+			stack.append((children, is_async, close))
+			children = child.__aiter__()
+			is_async = True
+			close = ''
+		else : # _CONVERT
+			stack.append((children, is_async, close))
+			children = iter((_converters[type(child)](child),))
+			is_async = False
+			close = ''
+
+_DONE = object()
+
+def _generate_own_html(node):
+	'''
+	Generate the html of node's own _render_parts().
+	Used when node has a custom __iter__ which calls HTMLGenerator.__iter__.
+	'''
+	open_html, children, close_html = node._render_parts()
+	if open_html :
+		yield open_html
+	yield from generate_child_html(iter(children))
+	if close_html :
+		yield close_html
 
-	yield escape(str(child))
+async def _agenerate_own_html(node):
+	open_html, children, close_html = node._arender_parts()
+	if open_html :
+		yield open_html
+	async for html in agenerate_child_html(iter(children)) :
+		yield html
+	if close_html :
+		yield close_html
 
+def _reject_async(child):
+	if isinstance(child, types.CoroutineType) :
+		# Avoid "coroutine was never awaited" warning, since we're raising a more helpful error
+		child.close()
+	raise TypeError(
+		f'Cannot render {type(child).__name__} synchronously. '
+		'Use "async for" or arender() to render awaitables and async iterables.'
+	)
 
 def generate_html(children: Iterable[Content]) -> Iterator[str]:
 	for child in children :
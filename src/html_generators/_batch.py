@@ -0,0 +1,97 @@
+import collections
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+from ._base import Content
+from ._fragment import Fragment
+
+class RenderResult(NamedTuple):
+	'''
+	The result of rendering one page with render_many().
+
+	path is set if out_dir was given, otherwise html is set.
+	size is the size of the page in bytes, once encoded with encoding
+	(whether or not it was written to a file).
+	'''
+	index: int
+	args: tuple
+	path: Optional[str]
+	html: Optional[str]
+	seconds: float
+	size: int
+
+def _render_one(factory, index, args, path, encoding):
+	'''
+	Runs in a worker process.
+	'''
+	start = time.perf_counter()
+	content = Fragment(factory(*args))
+	if path is None :
+		html = str(content)
+		size = len(html.encode(encoding))
+	else :
+		html = None
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		with open(path, 'wb') as f :
+			content.write_to(f, encoding=encoding)
+			size = f.tell()
+	return RenderResult(index, args, path, html, time.perf_counter() - start, size)
+
+def _default_filename(index, args):
+	return f'{index}.html'
+
+def render_many(
+	factory: Callable[..., Content],
+	args_iterable: Iterable[Any],
+	workers: Optional[int] = None,
+	out_dir: Optional[str] = None,
+	filename: Callable[[int, tuple], str] = _default_filename,
+	encoding: str = 'utf-8',
+) -> Iterator[RenderResult]:
+	'''
+	Render factory(*args) for each args in args_iterable, in a pool of
+	worker processes (rendering is CPU-bound, so threads wouldn't help).
+
+	Node trees can't be sent between processes, so we send factory and args
+	instead. Both must be picklable (ie. factory should be a module-level
+	function). Each item of args_iterable is a tuple of positional
+	arguments, or a single (non-tuple) argument.
+
+	If out_dir is given, each page is written directly to
+	os.path.join(out_dir, filename(index, args)) by the worker process,
+	and only the path is returned. Otherwise, the html is returned.
+
+	Returns an iterator of RenderResult, in the same order as args_iterable.
+	Pages are rendered (a few at a time, per worker) as you consume it.
+	workers defaults to os.cpu_count(). Pass workers=1 to render in the
+	current process (useful for debugging).
+	'''
+	workers = workers or os.cpu_count() or 1
+
+	def jobs():
+		for index, args in enumerate(args_iterable) :
+			if not isinstance(args, tuple) :
+				args = (args,)
+			path = None if out_dir is None else os.path.join(out_dir, filename(index, args))
+			yield factory, index, args, path, encoding
+
+	if workers <= 1 :
+		for job in jobs() :
+			yield _render_one(*job)
+		return
+
+	# Don't submit everything up front - args_iterable may be huge
+	max_pending = workers * 4
+	with ProcessPoolExecutor(workers) as executor :
+		pending = collections.deque()
+		try :
+			for job in jobs() :
+				pending.append(executor.submit(_render_one, *job))
+				if len(pending) >= max_pending :
+					yield pending.popleft().result()
+			while pending :
+				yield pending.popleft().result()
+		finally :
+			for future in pending :
+				future.cancel()
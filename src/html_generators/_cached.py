@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+from ._base import Content, HTMLGenerator, SafeString, agenerate_child_html, generate_child_html
+
+class CacheBackend:
+	'''
+	Base class for Cached backends.
+
+	get() should return the cached str, or None.
+	Cached keeps hit/miss counts on its backend.
+	'''
+	hits = 0
+	misses = 0
+
+	def get(self, key: Hashable) -> Optional[str]:
+		raise NotImplementedError()
+	def set(self, key: Hashable, html: str, ttl: Optional[float]) -> None:
+		raise NotImplementedError()
+
+class LRUCache(CacheBackend):
+	'''
+	In-process, thread-safe cache of the maxsize most recently used items.
+
+	ttl is in seconds (None means forever).
+	'''
+	def __init__(self, maxsize: int = 1024):
+		self.maxsize = maxsize
+		self._items = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key):
+		with self._lock :
+			try :
+				html, expires = self._items[key]
+			except KeyError :
+				return None
+			if expires is not None and expires <= time.monotonic() :
+				del self._items[key]
+				return None
+			self._items.move_to_end(key)
+			return html
+
+	def set(self, key, html, ttl):
+		expires = None if ttl is None else time.monotonic() + ttl
+		with self._lock :
+			self._items[key] = (html, expires)
+			self._items.move_to_end(key)
+			while len(self._items) > self.maxsize :
+				self._items.popitem(last=False)
+
+	def clear(self):
+		with self._lock :
+			self._items.clear()
+
+#: The backend used by Cached, unless you specify one
+default_cache = LRUCache()
+
+class Cached(HTMLGenerator):
+	'''
+	Render factory() only if key is not already in the cache.
+
+	factory is only called on a cache miss, when we are rendered. Its result
+	may be any Content. On a miss, the html is generated as usual (so streaming
+	responses are still streamed), and stored once it is complete.
+
+	Ie:
+	h.Cached(('product-card', product.id, product.modified), lambda: product_card(product), ttl=600)
+
+	backend defaults to an in-process LRUCache (h.default_cache).
+	See html_generators.django for a backend which uses django's cache.
+	'''
+	__slots__ = ('_key', '_factory', '_ttl', '_backend')
+	def __init__(
+		self, 
+		key: Hashable, 
+		factory: Callable[[], Content], 
+		ttl: Optional[float] = None, 
+		backend: Optional[CacheBackend] = None,
+	):
+		self._key = key
+		self._factory = factory
+		self._ttl = ttl
+		self._backend = default_cache if backend is None else backend
+
+	def _lookup(self) -> Optional[str]:
+		return self._backend.get(self._key)
+
+	def _render_parts(self):
+		html = self._lookup()
+		if html is not None :
+			self._backend.hits += 1
+			return '', (SafeString(html),), ''
+		self._backend.misses += 1
+		return '', self._render_and_store(), ''
+
+	def _arender_parts(self):
+		html = self._lookup()
+		if html is not None :
+			self._backend.hits += 1
+			return '', (SafeString(html),), ''
+		self._backend.misses += 1
+		# The factory's content may include awaitables
+		return '', (self._arender_and_store(),), ''
+
+	def _render_and_store(self):
+		parts = []
+		for html in generate_child_html(self._factory()) :
+			parts.append(html)
+			yield SafeString(html)
+		# Only reached if rendering completed
+		self._backend.set(self._key, ''.join(parts), self._ttl)
+
+	async def _arender_and_store(self):
+		parts = []
+		async for html in agenerate_child_html(self._factory()) :
+			parts.append(html)
+			yield SafeString(html)
+		self._backend.set(self._key, ''.join(parts), self._ttl)
@@ -8,10 +8,11 @@ class Comment(HTMLGenerator):
 		
 		Not really sure why you'd need to add comments (your code can just have python comments), but it's here in case you need it.
 	'''
+	__slots__ = ('_content',)
 	def __init__(self, content):
 		self._content = content
 
-	def __iter__(self):
-		yield '<!--'
-		yield str(self._content)
-		yield '-->'
\ No newline at end of file
+	def _render_parts(self):
+		return '<!--' + str(self._content) + '-->', (), ''
+	def _render_into(self, out):
+		out.append('<!--' + str(self._content) + '-->')
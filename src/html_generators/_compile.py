@@ -0,0 +1,172 @@
+import functools
+import inspect
+import re
+import uuid
+from ._base import HTMLGenerator, SafeString
+from ._escape import escape
+from ._fragment import Fragment
+from ._standard_elements import RAW_TEXT_ELEMENTS
+
+class _Slot:
+	'''
+	Stand-in for a component argument, used while compiling.
+
+	When rendered as a child (via __html__), we generate a "child marker".
+	When converted to a str (ie. used as an attribute value), we generate an
+	"attribute marker". Attribute markers within the content of a <script>,
+	<style> or comment are rendered raw (since those str() their content).
+
+	This is deliberately not an HTMLGenerator, so that anything which
+	iterates over an argument (ie. Join, Rows) fails, rather than compiling
+	the marker itself.
+	'''
+	__slots__ = ('_child_marker', '_attr_marker')
+	def __init__(self, token, index):
+		self._child_marker = f'\x00{token}c{index}\x00'
+		self._attr_marker = f'\x00{token}a{index}\x00'
+
+	def __html__(self):
+		return self._child_marker
+	def __str__(self):
+		return self._attr_marker
+
+	def __bool__(self):
+		raise TypeError(
+			'Arguments of a compiled component cannot be tested for truth. '
+			'Compiled components may only pass their arguments through as '
+			'children or attribute values.'
+		)
+	def __iter__(self):
+		raise TypeError(
+			'Arguments of a compiled component cannot be iterated over. '
+			'Compiled components may only pass their arguments through as '
+			'children or attribute values.'
+		)
+
+class _Compiled(HTMLGenerator):
+	'''
+	The output of a compiled component.
+
+	parts is a tuple of pre-rendered SafeStrings and "slots".
+	Only the slots do any work at render time.
+	'''
+	__slots__ = ('_parts', '_arguments')
+	def __init__(self, parts, arguments):
+		self._parts = parts
+		self._arguments = arguments
+
+	def _render_parts(self):
+		return '', self._children(), ''
+
+	def _children(self):
+		arguments = self._arguments
+		for part in self._parts :
+			if part.__class__ is SafeString :
+				yield part
+				continue
+
+			kind, name, attr = part
+			value = arguments[name]
+			if kind == 'c' :
+				yield value
+			elif kind == 'a' :
+				yield SafeString(escape(str(value)))
+			elif kind == 'r' :
+				# Content of a <script>/<style>/comment, which is never escaped
+				yield SafeString(str(value))
+			# kind == 'A' - an entire attribute, rendered just like open_tag does
+			elif value is False or value is None :
+				continue
+			elif value is True :
+				yield SafeString(' ' + attr)
+			else :
+				yield SafeString(f' {attr}="{escape(str(value))}"')
+
+# The content of raw text elements, which str() their content
+_RAW_TEXT = re.compile(
+	f'<({"|".join(RAW_TEXT_ELEMENTS)})\\b[^>]*>(.*?)</\\1>',
+	re.DOTALL,
+)
+# Comment also str()s its content
+_COMMENT = re.compile('<!--(.*?)-->', re.DOTALL)
+
+def _parse(html, token, names):
+	# An attribute whose value is exactly one argument is captured whole,
+	# so that None/False/True values behave just like they do in open_tag
+	pattern = re.compile(
+		f' ([^\\s"\'>/=]+)="\\x00{token}a(\\d+)\\x00"'
+		f'|\\x00{token}([ca])(\\d+)\\x00'
+	)
+	raw_spans = [match.span(2) for match in _RAW_TEXT.finditer(html)]
+	raw_spans += [match.span(1) for match in _COMMENT.finditer(html)]
+	parts = []
+	position = 0
+	for match in pattern.finditer(html) :
+		if match.start() > position :
+			parts.append(SafeString(html[position:match.start()]))
+		position = match.end()
+		attr, attr_index, kind, index = match.groups()
+		raw = any(start <= match.start() < end for start, end in raw_spans)
+		if attr is None :
+			# Attribute markers within raw text come from its str()
+			parts.append(('r' if raw and kind == 'a' else kind, names[int(index)], None))
+		elif raw :
+			# Looks like an attribute, but it's (ie.) javascript or a comment
+			parts.append(SafeString(f' {attr}="'))
+			parts.append(('r', names[int(attr_index)], None))
+			parts.append(SafeString('"'))
+		else :
+			parts.append(('A', names[int(attr_index)], attr))
+	if position < len(html) :
+		parts.append(SafeString(html[position:]))
+	return tuple(parts)
+
+def compile(component):
+	'''
+	Decorator for "component functions", which pre-renders the static parts
+	of their output.
+
+	The component is called once (on first use), with a placeholder for each
+	argument. All of the html which doesn't depend on the arguments is
+	rendered then, and joined into as few strings as possible. When the
+	compiled component is called, only its arguments are rendered.
+
+	Ie:
+	@h.compile
+	def page_shell(title, *content):
+		...
+
+	This only works if the component passes its arguments straight through,
+	as children or attribute values. The component must not otherwise
+	inspect its arguments (ie. test them for truth, access their attributes,
+	or iterate over them). Testing for truth or iterating raises a
+	TypeError, but other uses will silently produce incorrect output.
+	'''
+	signature = inspect.signature(component)
+	names = list(signature.parameters)
+	compiled_parts = None
+
+	def compile_parts():
+		token = uuid.uuid4().hex
+		args = []
+		kwargs = {}
+		for index, (name, parameter) in enumerate(signature.parameters.items()) :
+			slot = _Slot(token, index)
+			if parameter.kind is parameter.KEYWORD_ONLY :
+				kwargs[name] = slot
+			elif parameter.kind is parameter.VAR_KEYWORD :
+				raise TypeError('Compiled components cannot accept **kwargs.')
+			else :
+				args.append(slot)
+		html = str(Fragment(component(*args, **kwargs)))
+		return _parse(html, token, names)
+
+	@functools.wraps(component)
+	def compiled(*args, **kwargs):
+		nonlocal compiled_parts
+		if compiled_parts is None :
+			compiled_parts = compile_parts()
+		bound = signature.bind(*args, **kwargs)
+		bound.apply_defaults()
+		return _Compiled(compiled_parts, bound.arguments)
+	return compiled
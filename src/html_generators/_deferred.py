@@ -0,0 +1,98 @@
+from typing import Callable, Iterable, Iterator
+from ._base import Content, HTMLGenerator, SafeString
+
+class _Pending:
+	'''
+	The Deferred nodes found in the Document (or Body) currently being
+	rendered. Stored in the render's state (see
+	HTMLGenerator._render_stateful_parts()), keyed by this class.
+	'''
+	__slots__ = ('nodes', 'rendered')
+	def __init__(self):
+		self.nodes = []
+		self.rendered = 0
+
+_SWAP_SCRIPT = SafeString(
+	'<script>function hgDeferredSwap(id){'
+	'var t=document.getElementById(id+"-content");'
+	'document.getElementById(id).replaceWith(t.content);t.remove()'
+	'}</script>'
+)
+
+class Deferred(HTMLGenerator):
+	'''
+	Content which is rendered at the end of the document, so that it
+	doesn't hold up the rest of the page when streaming.
+
+	placeholder is rendered in its place, and the rest of the document
+	is streamed. factory() is called at the end of the enclosing <body>
+	(or Document), and its content is emitted in a <template>, along with
+	a small inline script which swaps it in place of the placeholder.
+
+	Ie:
+	h.Document(h.Body(
+		header(),
+		h.Deferred(lambda: recommendations(user), placeholder=h.P('Loading...')),
+		footer(),
+	))
+
+	If there is no enclosing Body/Document in the same render, factory() is
+	just rendered in place. That includes rendering a fragment, and content
+	which is rendered separately, like the content of Cached, Memo or
+	template() values (so those cache the real content, not the placeholder).
+
+	The placeholder is wrapped in an <hg-deferred> element with
+	"display: contents", which doesn't affect layout, but isn't allowed
+	everywhere (ie. directly inside a <table>). Scripts within the deferred
+	content won't run.
+	'''
+	__slots__ = ('_factory', '_placeholder')
+	def __init__(self, factory: Callable[[], Content], placeholder: Content = None):
+		self._factory = factory
+		self._placeholder = placeholder
+
+	def _render_parts(self):
+		return '', (self._factory(),), ''
+
+	def _render_stateful_parts(self, state):
+		pending = state.get(_Pending)
+		if pending is None :
+			return self._render_parts()
+		id = f'hg-deferred-{len(pending.nodes)}'
+		pending.nodes.append(self)
+		return (
+			f'<hg-deferred id="{id}" style="display:contents">',
+			(self._placeholder,),
+			'</hg-deferred>',
+		)
+
+def with_deferred(children: Iterable[Content], state: dict) -> Iterator[Content]:
+	'''
+	Used by Document and Body, with the state of the render they are part of.
+	Yields children, followed by any Deferred nodes found within them.
+
+	The walker renders each item we yield before asking for the next one,
+	so our _Pending is in state for as long as children are being rendered.
+	A Body within a Document shares the Document's _Pending (so ids are
+	unique), but renders whatever is pending before </body>.
+	'''
+	pending = state.get(_Pending)
+	owner = pending is None
+	if owner :
+		pending = state[_Pending] = _Pending()
+	try :
+		yield children
+		nodes = pending.nodes
+		# Deferred content may contain more Deferred nodes
+		while pending.rendered < len(nodes) :
+			index = pending.rendered
+			pending.rendered += 1
+			if index == 0 :
+				yield _SWAP_SCRIPT
+			id = f'hg-deferred-{index}'
+			yield SafeString(f'<template id="{id}-content">')
+			yield nodes[index]._factory()
+			yield SafeString(f'</template><script>hgDeferredSwap("{id}")</script>')
+	finally :
+		if owner :
+			del state[_Pending]
@@ -0,0 +1,121 @@
+import hashlib
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from ._base import Content, walk_child_html
+from ._element import Element
+
+class Diff(NamedTuple):
+	'''
+	The result of render_diff().
+
+	patches: (key, html) for each keyed element which changed. key is None
+	if something outside of any keyed element changed, in which case html
+	is the whole document (and it's the only patch).
+	hashes: pass this to the next render_diff() call.
+	'''
+	patches: List[Tuple[Optional[str], str]]
+	hashes: Dict[Optional[str], str]
+
+class _Region:
+	'''
+	The html of one keyed element (or the whole document), excluding its
+	keyed descendants (which are replaced by a marker).
+	'''
+	__slots__ = ('key', 'parent', 'start', 'end', 'own')
+	def __init__(self, key, parent, start):
+		self.key = key
+		self.parent = parent
+		self.start = start
+		self.end = None
+		self.own = []
+
+def _render_regions(content):
+	'''
+	Render content, recording a _Region for every keyed element.
+	on_open() returns the region opened by each level (or None).
+	'''
+	out = []
+	root = region = _Region(None, None, 0)
+	regions = [root]
+	keys = set()
+
+	def on_open(node):
+		nonlocal region
+		if not isinstance(node, Element) :
+			return None
+		key = node._attrs.get('id')
+		if key is None or key is False :
+			return None
+		key = str(key)
+		if key in keys :
+			raise ValueError(f'Duplicate element id: {key!r}')
+		keys.add(key)
+		region.own.append(f'\x00{key}\x00')
+		region = _Region(key, region, len(out))
+		regions.append(region)
+		return region
+
+	def on_emit(html):
+		out.append(html)
+		region.own.append(html)
+
+	def on_close(level_region):
+		nonlocal region
+		if level_region is not None :
+			level_region.end = len(out)
+			region = level_region.parent
+
+	for _ in walk_child_html(content, on_open, on_emit, on_close) :
+		pass
+	root.end = len(out)
+	return out, regions
+
+def _hash(strings):
+	return hashlib.md5(''.join(strings).encode('utf-8', 'surrogatepass')).hexdigest()
+
+def _hashes(regions):
+	return {region.key: _hash(region.own) for region in regions}
+
+def render_diff(
+	old: Union[None, Dict[Optional[str], str], Content],
+	new: Content,
+) -> Diff:
+	'''
+	Render new, but only return the html of the parts that differ from old.
+
+	Elements are identified by their id attribute. For each element with an
+	id, we hash its html (excluding any descendants with an id). An element
+	is patched if it is new, or its hash changed. Descendants of a patched
+	element are not patched separately.
+
+	old may be the hashes from a previous Diff (so you don't have to keep
+	or re-render the old tree), None (everything is new), or content (which
+	we render to compute its hashes).
+
+	Ie (with htmx, patches can be sent as out-of-band swaps):
+	diff = h.render_diff(session.get('dashboard'), dashboard(user))
+	session['dashboard'] = diff.hashes
+	'''
+	if old is None :
+		old_hashes = {}
+	elif isinstance(old, dict) :
+		old_hashes = old
+	else :
+		old_hashes = _hashes(_render_regions(old)[1])
+
+	out, regions = _render_regions(new)
+	hashes = _hashes(regions)
+
+	if old_hashes.get(None) != hashes[None] :
+		return Diff([(None, ''.join(out))], hashes)
+
+	patches = []
+	patched = set()
+	# Regions are in document order, so parents come before children
+	for region in regions[1:] :
+		if region.parent.key in patched :
+			patched.add(region.key)
+			continue
+		if old_hashes.get(region.key) != hashes[region.key] :
+			patched.add(region.key)
+			patches.append((region.key, ''.join(out[region.start:region.end])))
+	return Diff(patches, hashes)
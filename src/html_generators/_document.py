@@ -1,4 +1,5 @@
-from ._base import HTMLGenerator, generate_html
+from ._base import HTMLGenerator
+from ._deferred import with_deferred
 from ._standard_elements import Html
 
 class Document(HTMLGenerator):
@@ -10,9 +11,12 @@ class Document(HTMLGenerator):
 		If you specify html_attrs, all children will be wrapped in an <html>
 		element with the specified attrs. Just a shortcut.
 	'''
+	__slots__ = ('_children',)
 	def __init__(self, *children, **html_attrs):
 		self._children = [Html(children, **html_attrs)] if html_attrs else children
 
-	def __iter__(self):
-		yield '<!DOCTYPE html>\n'
-		yield from generate_html(self._children)
\ No newline at end of file
+	def _render_parts(self):
+		return self._render_stateful_parts({})
+
+	def _render_stateful_parts(self, state):
+		return '<!DOCTYPE html>\n', with_deferred(self._children, state), ''
@@ -1,18 +1,40 @@
-from . import _utils as utils
-from ._base import Content, HTMLGenerator, escape, generate_html, SafeString
+import sys
+import types
+from types import MappingProxyType
+from ._base import Content, HTMLGenerator, SafeString
+from ._escape import escape
 from ._mark_safe import MarkSafe
 
 def open_tag(name, attrs):
-	yield '<'+name
+	'''
+	Render an open tag, as a single str.
+	'''
+	if not attrs :
+		return f'<{name}>'
+	return open_tag_with_attrs('<' + name, attrs)
+
+def open_tag_with_attrs(start, attrs):
+	'''
+	start is the open tag, up to (but not including) the attributes.
+	'''
+	parts = [start]
 	for key, value in attrs.items() :
 		if value is False or value is None :
 			continue
-		yield ' '
-		yield key
 		if value is True :
+			parts.append(' ' + key)
 			continue
-		yield f'="{escape(str(value))}"'
-	yield '>'
+		type_ = type(value)
+		if type_ is str :
+			value = escape(value)
+		# str() of these never needs escaping
+		elif type_ is int or type_ is float :
+			value = str(value)
+		else :
+			value = escape(str(value))
+		parts.append(f' {key}="{value}"')
+	parts.append('>')
+	return ''.join(parts)
 
 def normalize(attr):
 	'''
@@ -30,8 +52,29 @@ def normalize(attr):
 	attribute I've ever seen in actual use.
 	'''
 	return attr.rstrip('_').replace('_', '-')
+
+# Shared by all elements without attributes. Read-only, so it can be shared.
+_EMPTY_ATTRS = MappingProxyType({})
+
+# Keyword argument name -> (interned) attribute name
+# Most code uses the same handful of attributes over and over.
+_normalized = {}
+_MAX_NORMALIZED = 2048
 def normalize_dict(attrs):
-	return {normalize(attr): value for attr, value in attrs.items()}
+	if not attrs :
+		return _EMPTY_ATTRS
+	normalized = _normalized
+	result = {}
+	for attr, value in attrs.items() :
+		try :
+			result[normalized[attr]] = value
+		except KeyError :
+			name = sys.intern(normalize(attr))
+			# Don't grow forever if someone passes arbitrary **attrs
+			if len(normalized) < _MAX_NORMALIZED :
+				normalized[attr] = name
+			result[name] = value
+	return result
 
 class Element(HTMLGenerator):
 	'''
@@ -49,22 +92,25 @@ class Element(HTMLGenerator):
 	- the HTML attributes of this element
 	'''
 	# TODO - document that attrs are OPTIONAL strings
+	__slots__ = ('_name', '_children', '_attrs')
 	def __init__(self, name_, *children: Content, **attrs: str):
 		self._name = name_
 		self._children = children
 		self._attrs = normalize_dict(attrs)
 
-	def __iter__(self):
-		yield from open_tag(self._name, self._attrs)
-		yield from generate_html(self._children)
-		yield f'</{self._name}>'
+	def _render_parts(self):
+		return (
+			open_tag(self._name, self._attrs),
+			self._children,
+			f'</{self._name}>',
+		)
 
 	def open_tag(self):
 		'''
 		Generate just the open tag, as a MarkSafe instance.
 		Useful when translating strings via h.format()
 		'''
-		return MarkSafe(''.join(open_tag(self._name, self._attrs)))
+		return MarkSafe(open_tag(self._name, self._attrs))
 	def close_tag(self):
 		'''
 		Generate just the close tag, as a MarkSafe instance.
@@ -79,21 +125,87 @@ class Element(HTMLGenerator):
 		Attribute names are normalized just like in __init__.
 		You can remove an existing attribute by setting it to None.
 		'''
-		clone = self.__class__(self._name)
-		clone._children = list(self._children)
+		clone = self._clone()
+		# Children are shared - clones never modify them
 		clone._attrs = dict(self._attrs, **normalize_dict(attrs))
 		return clone
+	def _clone(self):
+		'''
+		A shallow copy of self.
+
+		We don't call __init__, since subclasses may have any signature.
+		'''
+		cls = type(self)
+		clone = cls.__new__(cls)
+		for name in _instance_slots(cls) :
+			try :
+				setattr(clone, name, getattr(self, name))
+			except AttributeError :
+				# Slot was never set
+				pass
+		if hasattr(self, '__dict__') :
+			clone.__dict__.update(self.__dict__)
+		return clone
+
 	def with_classes(self, *classes):
 		'''Clone the element, with additional classes.'''
 		return self.with_attrs(
-			class_=utils.classes(self._attrs.get('class'), *classes),
+			class_=_JoinedAttr.extend(' ', self._attrs.get('class'), classes),
 		)
 	def with_styles(self, *styles):
 		'''Clone the element, with additional styles.'''
 		return self.with_attrs(
-			style=utils.styles(self._attrs.get('style'), *styles),
+			style=_JoinedAttr.extend('; ', self._attrs.get('style'), styles),
 		)
 
+class _JoinedAttr:
+	'''
+	An attribute value built by with_classes()/with_styles().
+
+	Components often chain several of these calls, so rather than joining
+	the strings each time, we only collect them, and join them (skipping
+	falsy values, like h.classes()/h.styles()) when rendered.
+	Clones share the collected tuple.
+	'''
+	__slots__ = ('separator', 'values', '_joined')
+	def __init__(self, separator, values):
+		self.separator = separator
+		self.values = values
+		self._joined = None
+
+	@classmethod
+	def extend(cls, separator, existing, values):
+		if existing.__class__ is cls and existing.separator == separator :
+			return cls(separator, existing.values + values)
+		return cls(separator, (existing, *values))
+
+	def __str__(self):
+		if self._joined is None :
+			self._joined = self.separator.join(filter(None, self.values))
+		return self._joined
+
+_slot_names = {}
+def _instance_slots(cls):
+	'''
+	The names of all slots which hold per-instance state.
+	Slots that are shadowed by class attributes (ie. _name, on the 
+	standard element classes) are skipped.
+	'''
+	try :
+		return _slot_names[cls]
+	except KeyError :
+		pass
+	names = []
+	for klass in cls.__mro__ :
+		slots = klass.__dict__.get('__slots__', ())
+		if isinstance(slots, str) :
+			slots = (slots,)
+		for name in slots :
+			if isinstance(getattr(cls, name, None), types.MemberDescriptorType) :
+				names.append(name)
+	_slot_names[cls] = names
+	return names
+
 class VoidElement(Element):
 	'''
 	A Void HTML Element 
@@ -105,11 +217,14 @@ class VoidElement(Element):
 	Note - name_ is so that h.VoidElement('input', name='FOO') doesn't complain about multiple values for argument 'name'
 	Ideally, we'd use (self, name, /, **attrs) to specify that name is positional-only, but that's only available in 3.9
 	'''
+	__slots__ = ()
 	def __init__(self, name_, **attrs):
 		super().__init__(name_, **attrs)
 
-	def __iter__(self):
-		yield from open_tag(self._name, self._attrs)
+	def _render_parts(self):
+		return open_tag(self._name, self._attrs), (), ''
+	def _render_into(self, out):
+		out.append(open_tag(self._name, self._attrs))
 
 	def close_tag(self):
 		return ''
@@ -128,16 +243,21 @@ class RawTextElement(Element):
 	https://html.spec.whatwg.org/multipage/syntax.html#elements-2
 	https://html.spec.whatwg.org/multipage/syntax.html#cdata-rcdata-restrictions)
 	'''
+	__slots__ = ('_content',)
 	def __init__(self, name, *content, **attrs):
 		super().__init__(name, **attrs)
 		self._content = content
 
-	def __iter__(self):
-		yield from open_tag(self._name, self._attrs)
-		
-		# stringify whatever the user passed in.
-		# It's our responsibility to only generate str instances (otherwise it can lead to hard-to-debug errors).
-		# It's probably faster to do this than to "assert isinstance(content, str)", and the user might expect us to support "stringifiable" things, anway -- ie: h.Script(h.Div('This is a template'), type='text/template')
-		yield from (str(c) for c in self._content)
-
-		yield f'</{self._name}>'
+	def _render_parts(self):
+		return (
+			open_tag(self._name, self._attrs),
+			(),
+			# stringify whatever the user passed in.
+			# It's our responsibility to only generate str instances (otherwise it can lead to hard-to-debug errors).
+			# It's probably faster to do this than to "assert isinstance(content, str)", and the user might expect us to support "stringifiable" things, anway -- ie: h.Script(h.Div('This is a template'), type='text/template')
+			''.join(str(c) for c in self._content) + f'</{self._name}>',
+		)
+	def _render_into(self, out):
+		open_html, _, close_html = self._render_parts()
+		out.append(open_html)
+		out.append(close_html)
@@ -0,0 +1,45 @@
+'''
+Fast html escaping
+
+Produces exactly the same output as html.escape(s) (quote=True), but:
+- returns s itself (no new string) when nothing needs escaping, which is 
+by far the most common case
+- uses markupsafe's C speedups, when installed
+'''
+try :
+	# Private, markupsafe 3.0+ (Python 3.9+)
+	# Only difference from html.escape is that it uses numeric entities for quotes
+	from markupsafe._speedups import _escape_inner
+except ImportError :
+	try :
+		# markupsafe 2.x. Same output, but as a Markup (str subclass).
+		from markupsafe._speedups import escape as _markup_escape
+	except ImportError :
+		_escape_inner = None
+	else :
+		def _escape_inner(s):
+			return str.__str__(_markup_escape(s))
+if _escape_inner is not None :
+	# In case a future version changes its output, fall back to stdlib
+	if _escape_inner('&<>"\'') != '&amp;&lt;&gt;&#34;&#39;' :
+		_escape_inner = None
+
+if _escape_inner is None :
+	from html import escape as _stdlib_escape
+
+	def escape(s: str) -> str:
+		if '&' in s or '<' in s or '>' in s or '"' in s or "'" in s :
+			return _stdlib_escape(s)
+		return s
+else :
+	def escape(s: str) -> str:
+		if '&' in s or '<' in s or '>' in s or '"' in s or "'" in s :
+			html = _escape_inner(s)
+			# Use the same entities as html.escape
+			# ("&#34;" can't come from anything else, since "&" is escaped)
+			if '"' in s :
+				html = html.replace('&#34;', '&quot;')
+			if "'" in s :
+				html = html.replace('&#39;', '&#x27;')
+			return html
+		return s
@@ -1,5 +1,6 @@
 from ._fragment import Fragment
 from ._mark_safe import MarkSafe
+from ._template import format_segments, parse_format
 
 def format(*template, **context):
     '''
@@ -20,7 +21,7 @@ def format(*template, **context):
     # Escape template, as needed
     template = str(Fragment(template))
     
-    return MarkSafe(template.format(**{
+    return MarkSafe(format_segments(parse_format(template), {
         # escape context, as needed
         k: str(Fragment(v))
         for k, v in context.items()
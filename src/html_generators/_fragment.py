@@ -1,4 +1,4 @@
-from ._base import HTMLGenerator, generate_html
+from ._base import HTMLGenerator
 
 class Fragment(HTMLGenerator):
 	'''
@@ -8,8 +8,9 @@ class Fragment(HTMLGenerator):
 
 		Useful only when you need to render multiple nodes directly to a string (ie. to pass off to some other template system, or to generate the body of an HTML email).
 	'''
+	__slots__ = ('_children',)
 	def __init__(self, *children):
 		self._children = children
 
-	def __iter__(self):
-		yield from generate_html(self._children)
\ No newline at end of file
+	def _render_parts(self):
+		return '', self._children, ''
\ No newline at end of file
@@ -1,4 +1,4 @@
-from ._base import Content, HTMLGenerator, generate_child_html
+from ._base import Content, HTMLGenerator, SafeString
 from typing import Iterable, Iterator
 
 class Join(HTMLGenerator):
@@ -10,12 +10,17 @@ class Join(HTMLGenerator):
 	"items" MAY contain "empty values" (None, False) - 
 	they will NOT cause an extra joiner to be rendered.
 	'''
+	__slots__ = ('_joiner', '_items')
 	def __init__(self, joiner: Content, items: Iterable[Content]):
 		# Stringify joiner only once.
-		self._joiner = str(joiner)
+		# It's a SafeString so that it is rendered as-is when we pass it along with our items.
+		self._joiner = SafeString(joiner)
 		self._items = items
 
-	def __iter__(self):
+	def _render_parts(self):
+		return '', self._join_items(), ''
+
+	def _join_items(self) -> Iterator[Content]:
 		first_item = True
 		for child in self._items :
 			# Skip "explicitly empty" items, just like all other generators
@@ -29,4 +34,4 @@ class Join(HTMLGenerator):
 				first_item = False
 
 			# child could be another HTMLGenerator, iterable, etc.
-			yield from generate_child_html(child)
\ No newline at end of file
+			yield child
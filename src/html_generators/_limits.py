@@ -0,0 +1,101 @@
+import time
+from typing import List, Optional
+from ._base import Content, HTMLGenerator, walk_child_html
+from ._element import Element
+
+class RenderLimitExceeded(Exception):
+	'''
+	Raised by Limited when rendering exceeds one of its limits.
+
+	limit: the name of the limit (ie. "max_nodes")
+	path: the element names (or class names, for other nodes) from the
+	Limited node down to where rendering was stopped
+	'''
+	def __init__(self, limit: str, value, path: List[str]):
+		self.limit = limit
+		self.value = value
+		self.path = path
+		super().__init__(f'{limit}={value} exceeded, at: {" > ".join(path) or "(top level)"}')
+
+class Limited(HTMLGenerator):
+	'''
+	Render content, but raise RenderLimitExceeded as soon as it exceeds
+	any of these limits (None means unlimited):
+
+	max_bytes: the size of the output, utf-8 encoded
+	max_nodes: the number of nodes (elements, etc.) rendered
+	max_depth: how deeply nodes and iterables are nested
+	timeout: seconds, from when rendering starts
+
+	Ie:
+	return StreamingHttpResponse(h.Limited(page(), max_bytes=10_000_000, timeout=30))
+
+	Output which was already streamed can't be taken back, so the client
+	will see a truncated response. Content rendered by other means (ie.
+	the content of Cached or template() nodes) only counts towards
+	max_bytes and timeout, as do children which render nothing (None/False).
+	Async content is not supported.
+	'''
+	__slots__ = ('_content', '_max_bytes', '_max_nodes', '_max_depth', '_timeout')
+	def __init__(
+		self,
+		content: Content,
+		max_bytes: Optional[int] = None,
+		max_nodes: Optional[int] = None,
+		max_depth: Optional[int] = None,
+		timeout: Optional[float] = None,
+	):
+		self._content = content
+		self._max_bytes = max_bytes
+		self._max_nodes = max_nodes
+		self._max_depth = max_depth
+		self._timeout = timeout
+
+	def __iter__(self):
+		'''
+		(We implement __iter__ rather than _render_parts(), so that our output
+		isn't escaped again.)
+		labels has one entry per open level (None for iterables).
+		'''
+		max_bytes = self._max_bytes
+		max_nodes = self._max_nodes
+		max_depth = self._max_depth
+		deadline = None if self._timeout is None else time.monotonic() + self._timeout
+		size = 0
+		nodes = 0
+		labels = []
+
+		def exceeded(limit, value):
+			return RenderLimitExceeded(limit, value, [label for label in labels if label is not None])
+
+		def check_clock(_=None):
+			if deadline is not None and time.monotonic() > deadline :
+				raise exceeded('timeout', self._timeout)
+
+		def on_open(node):
+			nonlocal nodes
+			check_clock()
+			if node is not None and max_nodes is not None :
+				nodes += 1
+				if nodes > max_nodes :
+					raise exceeded('max_nodes', max_nodes)
+			labels.append(
+				None if node is None
+				else node._name if isinstance(node, Element)
+				else type(node).__name__
+			)
+			if max_depth is not None and len(labels) > max_depth :
+				raise exceeded('max_depth', max_depth)
+
+		def on_emit(html):
+			nonlocal size
+			check_clock()
+			if max_bytes is not None :
+				size += len(html) if html.isascii() else len(html.encode('utf-8', 'surrogatepass'))
+				if size > max_bytes :
+					raise exceeded('max_bytes', max_bytes)
+
+		def on_close(_):
+			labels.pop()
+
+		return walk_child_html(self._content, on_open, on_emit, on_close, check_clock)
@@ -8,8 +8,11 @@ class MarkSafe(HTMLGenerator):
 
 	Note that strings generated by markupsafe or Django's format_html() are handled automatically - you don't need to wrap them in this class.
 	'''
+	__slots__ = ('_html',)
 	def __init__(self, html):
 		self._html = html
 
-	def __iter__(self):
-		yield self._html
\ No newline at end of file
+	def _render_parts(self):
+		return self._html, (), ''
+	def _render_into(self, out):
+		out.append(self._html)
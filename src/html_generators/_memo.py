@@ -0,0 +1,108 @@
+import threading
+from ._base import Content, HTMLGenerator, SafeString, agenerate_child_html, generate_child_html
+
+class Memo(HTMLGenerator):
+	'''
+	Content which can be rendered more than once, even if it contains
+	"one-shot" generators.
+
+	The first render is streamed as usual, and the html is recorded as it
+	goes. Later renders replay the recorded html. If the first render is
+	abandoned part way through, the next render replays what was recorded,
+	and then carries on where the first one stopped. If the first render
+	fails, later renders raise the same exception (rather than replaying
+	incomplete html).
+
+	Ie:
+	nav = h.Memo(h.Ul(h.Li(link) for link in links))
+	h.Body(h.Nav(nav, class_='desktop'), h.Nav(nav, class_='mobile'))
+
+	HTMLGenerator.materialize() is a shortcut for Memo(self).
+	'''
+	__slots__ = ('_content', '_source', '_is_async', '_parts', '_html', '_error', '_lock')
+	def __init__(self, content: Content):
+		self._content = content
+		self._source = None
+		self._is_async = False
+		self._parts = []
+		self._html = None
+		self._error = None
+		self._lock = threading.RLock()
+
+	def _render_parts(self):
+		if self._html is not None :
+			return self._html, (), ''
+		if self._is_async :
+			raise TypeError(
+				'This Memo was first rendered asynchronously. '
+				'Use "async for" or arender() until it has been completely rendered.'
+			)
+		return '', self._replay(), ''
+
+	def _arender_parts(self):
+		if self._html is not None :
+			return self._html, (), ''
+		if self._source is not None and not self._is_async :
+			# Carry on with the sync render that was already started
+			return '', self._replay(), ''
+		return '', (self._areplay(),), ''
+
+	def _replay(self):
+		parts = self._parts
+		index = 0
+		while True :
+			if index == len(parts) :
+				# Two renders may be racing for the next string
+				with self._lock :
+					if index == len(parts) :
+						if self._html is not None :
+							# Another render just finished
+							return
+						if self._error is not None :
+							raise self._error
+						if self._source is None :
+							self._source = generate_child_html(self._content)
+						try :
+							html = next(self._source, None)
+						except Exception as e :
+							self._error = e
+							raise
+						if html is None :
+							self._finish()
+							return
+						parts.append(html)
+			yield SafeString(parts[index])
+			index += 1
+
+	async def _areplay(self):
+		# We can't hold a threading.Lock across an await, but async renders
+		# of one Memo normally share a single thread
+		parts = self._parts
+		index = 0
+		while True :
+			if index == len(parts) :
+				if self._html is not None :
+					return
+				if self._error is not None :
+					raise self._error
+				if self._source is None :
+					self._source = agenerate_child_html(self._content)
+					self._is_async = True
+				try :
+					html = await self._source.__anext__()
+				except StopAsyncIteration :
+					self._finish()
+					return
+				except Exception as e :
+					self._error = e
+					raise
+				parts.append(html)
+			yield SafeString(parts[index])
+			index += 1
+
+	def _finish(self):
+		if self._html is None :
+			self._html = SafeString(''.join(self._parts))
+		# Release the content (and anything its generators hold on to)
+		self._content = self._source = None
+		self._parts = []
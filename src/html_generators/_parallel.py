@@ -0,0 +1,44 @@
+import asyncio
+import inspect
+from ._base import HTMLGenerator
+
+class Parallel(HTMLGenerator):
+	'''
+	Like Fragment, but when rendered asynchronously, all awaitable children
+	are started concurrently (as soon as we reach this node in the document).
+
+	Output is still generated in document order - the html of each child is
+	generated as soon as that child (and all children before it) are ready.
+
+	Ie:
+	h.Parallel(sidebar(), recommendations(), h.P('Static content'))
+	where sidebar() and recommendations() are coroutines, will take about as
+	long to render as the slower of the two.
+
+	Only direct children are started early. Awaitables nested deeper are 
+	awaited when we reach them, as usual.
+	When rendered synchronously, awaitable children raise TypeError (as usual).
+	'''
+	__slots__ = ('_children',)
+	def __init__(self, *children):
+		self._children = children
+
+	def _render_parts(self):
+		return '', self._children, ''
+
+	def _arender_parts(self):
+		return '', self._start_children(), ''
+
+	def _start_children(self):
+		tasks = [
+			asyncio.ensure_future(child) if inspect.isawaitable(child) else child
+			for child in self._children
+		]
+		try :
+			yield from tasks
+		finally :
+			# In case rendering is abandoned, don't leave anything running
+			# (no-op for completed tasks)
+			for task in tasks :
+				if isinstance(task, asyncio.Future) :
+					task.cancel()
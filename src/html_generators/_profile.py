@@ -0,0 +1,279 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+from . import _base
+from ._base import HTMLGenerator, walk_child_html
+from ._element import Element
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+class ProfileStats:
+	'''
+	Totals for one element name (ie. "div"), node class (ie. "Join") or
+	component function (ie. "book_section()").
+
+	seconds includes time spent rendering descendants (but not recursive
+	calls twice), self_seconds does not. strings and bytes include
+	descendants.
+	'''
+	__slots__ = ('calls', 'seconds', 'self_seconds', 'strings', 'bytes')
+	def __init__(self):
+		self.calls = 0
+		self.seconds = 0.0
+		self.self_seconds = 0.0
+		self.strings = 0
+		self.bytes = 0
+
+class _Frame:
+	__slots__ = ('label', 'component', 'start', 'child_seconds', 'strings', 'bytes', 'path')
+	def __init__(self, label, component, parent):
+		self.label = label
+		self.component = component
+		self.start = time.perf_counter()
+		self.child_seconds = 0.0
+		self.strings = 0
+		self.bytes = 0
+		self.path = label if parent is None else parent.path + ';' + label
+
+class Profile:
+	'''
+	Records where rendering time is spent. Use profile() to create one.
+
+	Each node is attributed to its element name (or class name, for other
+	nodes), and to the "component" (the function outside of
+	html_generators) which created it.
+	'''
+	def __init__(self):
+		self.stats: Dict[str, ProfileStats] = {}
+		# self seconds per collapsed stack (ie. "page();html;body;div")
+		self.stacks: Dict[str, float] = {}
+		self._components = {}
+		self._patched = []
+		# Frames and active counts are per-thread (stats are shared)
+		self._local = threading.local()
+
+	# Starting/stopping
+
+	def start(self) -> None:
+		if _base._profiler is not None :
+			raise RuntimeError('Another profile is already active.')
+		self._patch_constructors()
+		_base._profiler = self
+
+	def stop(self) -> None:
+		if _base._profiler is self :
+			_base._profiler = None
+		for cls, init in reversed(self._patched) :
+			cls.__init__ = init
+		self._patched = []
+		self._components.clear()
+
+	def __enter__(self) -> 'Profile':
+		self.start()
+		return self
+	def __exit__(self, *exc_info):
+		self.stop()
+
+	def _patch_constructors(self):
+		'''
+		Record which component function created each node.
+
+		We can only learn that while the node is being constructed (by the
+		time it's rendered, the component has long since returned).
+		Nodes are keyed by id(), since they don't support weak references.
+		'''
+		components = self._components
+		def patch(cls):
+			for subclass in cls.__subclasses__() :
+				patch(subclass)
+			init = cls.__dict__.get('__init__')
+			if init is None :
+				return
+			def __init__(node, *args, **kwargs):
+				components[id(node)] = _calling_component()
+				init(node, *args, **kwargs)
+			cls.__init__ = __init__
+			self._patched.append((cls, init))
+		patch(HTMLGenerator)
+
+	# Recording
+
+	def _push(self, node, label):
+		'''
+		Push a frame for node (and one for its component, if that differs
+		from the component of the enclosing frame).
+		Returns the number of frames pushed.
+		'''
+		frames = self._frames()
+		parent = frames[-1] if frames else None
+		component = self._components.get(id(node))
+		pushed = 1
+		if component is not None and (parent is None or parent.component != component) :
+			parent = _Frame(component + '()', component, parent)
+			frames.append(parent)
+			self._enter(parent.label)
+			pushed = 2
+		elif component is None and parent is not None :
+			component = parent.component
+		frame = _Frame(label, component, parent)
+		frames.append(frame)
+		self._enter(label)
+		return pushed
+
+	def _pop(self, count):
+		frames = self._frames()
+		active_counts = self._active_counts()
+		for _ in range(count) :
+			frame = frames.pop()
+			seconds = time.perf_counter() - frame.start
+			self_seconds = seconds - frame.child_seconds
+			stats = self.stats.get(frame.label)
+			if stats is None :
+				stats = self.stats[frame.label] = ProfileStats()
+			stats.calls += 1
+			stats.self_seconds += self_seconds
+			# Don't count recursive calls (ie. div inside div) twice
+			active = active_counts[frame.label] = active_counts[frame.label] - 1
+			if not active :
+				stats.seconds += seconds
+				stats.strings += frame.strings
+				stats.bytes += frame.bytes
+			self.stacks[frame.path] = self.stacks.get(frame.path, 0.0) + self_seconds
+			if frames :
+				parent = frames[-1]
+				parent.child_seconds += seconds
+				parent.strings += frame.strings
+				parent.bytes += frame.bytes
+
+	def _enter(self, label):
+		active_counts = self._active_counts()
+		active_counts[label] = active_counts.get(label, 0) + 1
+
+	def _frames(self):
+		try :
+			return self._local.frames
+		except AttributeError :
+			frames = self._local.frames = []
+			return frames
+
+	def _active_counts(self):
+		'''
+		How many frames with each label are open (in this thread).
+		'''
+		try :
+			return self._local.active_counts
+		except AttributeError :
+			active_counts = self._local.active_counts = {}
+			return active_counts
+
+	def _count(self, html):
+		frames = self._frames()
+		if frames :
+			frame = frames[-1]
+			frame.strings += 1
+			frame.bytes += len(html.encode('utf-8', 'surrogatepass'))
+
+	def generate(self, child):
+		'''
+		Used by generate_child_html() and render_child_html(), while we're
+		active. on_open() returns the number of frames pushed for each level.
+		'''
+		return walk_child_html(child, self._open, self._count, self._pop)
+
+	def _open(self, node):
+		if node is None :
+			return 0
+		return self._push(node, _label(node))
+
+	# Reporting
+
+	def summary(self, sort: str = 'self_seconds', limit: Optional[int] = 30) -> str:
+		'''
+		A table of stats, sorted by the given ProfileStats attribute.
+		'''
+		rows = sorted(self.stats.items(), key=lambda item: getattr(item[1], sort), reverse=True)
+		if limit is not None :
+			rows = rows[:limit]
+		header = f'{"name":<40} {"calls":>8} {"total ms":>10} {"self ms":>10} {"strings":>9} {"bytes":>10}'
+		lines = [header, '-' * len(header)]
+		for label, stats in rows :
+			lines.append(
+				f'{label:<40} '
+				f'{stats.calls:>8} '
+				f'{stats.seconds * 1000:>10.3f} '
+				f'{stats.self_seconds * 1000:>10.3f} '
+				f'{stats.strings:>9} '
+				f'{stats.bytes:>10}'
+			)
+		return '\n'.join(lines)
+
+	def collapsed(self) -> str:
+		'''
+		Self time (in microseconds) per stack, in the "collapsed stacks"
+		format used by flamegraph.pl, speedscope, etc.
+		'''
+		return ''.join(
+			f'{path} {round(seconds * 1e6)}\n'
+			for path, seconds in self.stacks.items()
+		)
+
+	def write_collapsed(self, path: str) -> None:
+		with open(path, 'w') as f :
+			f.write(self.collapsed())
+
+def profile() -> Profile:
+	'''
+	Profile rendering.
+
+	Ie:
+	with h.profile() as p:
+		html = str(page())
+	print(p.summary())
+	p.write_collapsed('page.folded')
+
+	Nodes must be created inside the with block to be attributed to their
+	component functions. Only synchronous rendering is profiled, and
+	only one profile can be active at a time. Time between strings
+	is attributed to the innermost open node, so time spent by whoever is
+	consuming a stream (ie. writing to a socket) is included.
+
+	When no profile is active, this module adds a single check per render
+	(not per node).
+
+	You can also set the HTML_GENERATORS_PROFILE environment variable to a
+	path prefix, to profile the whole process. At exit, a summary is
+	written to PREFIX.txt, and collapsed stacks to PREFIX.folded.
+	'''
+	return Profile()
+
+def _label(node):
+	if isinstance(node, Element) :
+		return node._name
+	return type(node).__name__
+
+def _calling_component():
+	frame = sys._getframe(2)
+	while frame is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR) :
+		frame = frame.f_back
+	if frame is None :
+		return None
+	code = frame.f_code
+	if code.co_name == '<module>' :
+		return None
+	return getattr(code, 'co_qualname', code.co_name)
+
+def _profile_process(prefix):
+	process_profile = profile()
+	process_profile.start()
+	def write():
+		process_profile.stop()
+		with open(prefix + '.txt', 'w') as f :
+			f.write(process_profile.summary(limit=None) + '\n')
+		process_profile.write_collapsed(prefix + '.folded')
+	atexit.register(write)
+
+if os.environ.get('HTML_GENERATORS_PROFILE') :
+	_profile_process(os.environ['HTML_GENERATORS_PROFILE'])
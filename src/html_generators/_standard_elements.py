@@ -1,10 +1,8 @@
 '''
-Shortcut factories for all (non-svg) standard HTML elements
+Classes for all (non-svg) standard HTML elements
 '''
-from ._element import Element, VoidElement, RawTextElement
-
-# Note - we add items to this dynamically, below
-__all__ = []
+import threading
+from ._element import Element, VoidElement, RawTextElement, normalize_dict, open_tag_with_attrs
 
 # Taken from https://html.spec.whatwg.org/multipage/syntax.html June 19, 2020
 VOID_ELEMENTS = [
@@ -25,137 +23,250 @@ VOID_ELEMENTS = [
 ]
 RAW_TEXT_ELEMENTS = ['script', 'style']
 
-def registered_factory(element_name):
-	__all__.append(element_name.title())
+# Base classes for the per-element classes generated below.
+# Each of those has the element name, and its constant open/close tag
+# html, as class attributes, so they don't need to be stored on (or
+# rendered for) each instance.
+
+class _StandardElement(Element):
+	__slots__ = ()
+	def __init__(self, *children, **attrs):
+		self._children = children
+		self._attrs = normalize_dict(attrs)
+
+	def _render_parts(self):
+		attrs = self._attrs
+		return (
+			open_tag_with_attrs(self._open_start, attrs) if attrs else self._open,
+			self._children,
+			self._close,
+		)
+
+class _StandardVoidElement(VoidElement):
+	__slots__ = ()
+	def __init__(self, **attrs):
+		self._children = ()
+		self._attrs = normalize_dict(attrs)
+
+	def _render_parts(self):
+		attrs = self._attrs
+		return (
+			open_tag_with_attrs(self._open_start, attrs) if attrs else self._open,
+			(),
+			'',
+		)
+	def _render_into(self, out):
+		attrs = self._attrs
+		out.append(open_tag_with_attrs(self._open_start, attrs) if attrs else self._open)
+
+class _StandardRawTextElement(RawTextElement):
+	__slots__ = ()
+	def __init__(self, *content, **attrs):
+		self._children = ()
+		self._attrs = normalize_dict(attrs)
+		self._content = content
+
+class _StandardTableElement(_StandardElement):
+	__slots__ = ()
+	@classmethod
+	def from_rows(cls, rows, columns=None, cell_attrs=None, headers=None, **attrs):
+		'''
+		A table with a <tbody> of Rows, and (if headers is given) a <thead>.
+		See Rows for the other arguments.
+
+		Ie:
+		h.Table.from_rows(users, columns=['name', 'email'], headers=['Name', 'Email'], class_='users')
+		'''
+		# Imported here, so _rows is only imported if used
+		# (and so the element classes are created via __getattr__)
+		from ._rows import Rows
+		from ._standard_elements import Tbody, Th, Thead, Tr
+		return cls(
+			headers is not None and Thead(Tr(Th(header) for header in headers)),
+			Tbody(Rows(rows, columns, cell_attrs)),
+			**attrs
+		)
 
+class _StandardBodyElement(_StandardElement):
+	__slots__ = ()
+	def _render_parts(self):
+		return self._render_stateful_parts({})
+
+	def _render_stateful_parts(self, state):
+		# Imported here, so _deferred is only imported if used
+		from ._deferred import with_deferred
+		open_html, children, close_html = super()._render_parts()
+		# Deferred content is rendered at the end of the body
+		return open_html, with_deferred(children, state), close_html
+
+# Elements with extra behaviour
+_special_bases = {
+	'body': _StandardBodyElement,
+	'table': _StandardTableElement,
+}
+
+def element_class(element_name):
 	# NOTE - we're ignoring some special element types (the template element, escapable raw text elements) and treating them as "normal" -> it makes little to no difference in terms of the html we generate
 	# escapable raw text elements (ie. <title>) can't have child elements. We _could_ implement those, and do extra validation, but it's not really our job to be an HTML validator - users still have to be aware of which elements are allowed inside which other elements
-	type_ = (
-		VoidElement if element_name in VOID_ELEMENTS 
-		else RawTextElement if element_name in RAW_TEXT_ELEMENTS
-		else Element
+	base = (
+		_special_bases[element_name] if element_name in _special_bases
+		else _StandardVoidElement if element_name in VOID_ELEMENTS 
+		else _StandardRawTextElement if element_name in RAW_TEXT_ELEMENTS
+		else _StandardElement
 	)
-
-	def factory(*args, **kwargs):
-		return type_(element_name, *args, **kwargs)
-	factory.__name__ = element_name
-	factory.__doc__ = f'''<{element_name}> {type_.__name__} factory.'''
-	return factory
+	name = element_name.title()
+	return type(base)(name, (base,), dict(
+		__slots__=(),
+		# Instances are pickled by reference to the class, which must be importable
+		__module__='html_generators',
+		__qualname__=name,
+		__doc__=f'''<{element_name}> {base.__bases__[0].__name__}.''',
+		_name=element_name,
+		_open=f'<{element_name}>',
+		_open_start=f'<{element_name}',
+		_close=f'</{element_name}>',
+	))
 
 # List adapted from https://developer.mozilla.org/en-US/docs/Web/HTML/Element June 19, 2020
 # (doesn't include svg elements)
-Html = registered_factory('html')
-Body = registered_factory('body')
-Base = registered_factory('base')
-Head = registered_factory('head')
-Link = registered_factory('link')
-Meta = registered_factory('meta')
-Style = registered_factory('style')
-Title = registered_factory('title')
-Address = registered_factory('address')
-Article = registered_factory('article')
-Aside = registered_factory('aside')
-Footer = registered_factory('footer')
-Header = registered_factory('header')
-H1 = registered_factory('h1')
-H2 = registered_factory('h2')
-H3 = registered_factory('h3')
-H4 = registered_factory('h4')
-H5 = registered_factory('h5')
-H6 = registered_factory('h6')
-Hgroup = registered_factory('hgroup')
-Main = registered_factory('main')
-Nav = registered_factory('nav')
-Section = registered_factory('section')
-Blockquote = registered_factory('blockquote')
-Dd = registered_factory('dd')
-Div = registered_factory('div')
-Dl = registered_factory('dl')
-Dt = registered_factory('dt')
-Figcaption = registered_factory('figcaption')
-Figure = registered_factory('figure')
-Hr = registered_factory('hr')
-Li = registered_factory('li')
-Main = registered_factory('main')
-Ol = registered_factory('ol')
-P = registered_factory('p')
-Pre = registered_factory('pre')
-Ul = registered_factory('ul')
-A = registered_factory('a')
-Abbr = registered_factory('abbr')
-B = registered_factory('b')
-Bdi = registered_factory('bdi')
-Bdo = registered_factory('bdo')
-Br = registered_factory('br')
-Cite = registered_factory('cite')
-Code = registered_factory('code')
-Data = registered_factory('data')
-Dfn = registered_factory('dfn')
-Em = registered_factory('em')
-I = registered_factory('i')
-Kbd = registered_factory('kbd')
-Mark = registered_factory('mark')
-Q = registered_factory('q')
-Rb = registered_factory('rb')
-Rp = registered_factory('rp')
-Rt = registered_factory('rt')
-Rtc = registered_factory('rtc')
-Ruby = registered_factory('ruby')
-S = registered_factory('s')
-Samp = registered_factory('samp')
-Small = registered_factory('small')
-Span = registered_factory('span')
-Strong = registered_factory('strong')
-Sub = registered_factory('sub')
-Sup = registered_factory('sup')
-Time = registered_factory('time')
-U = registered_factory('u')
-Var = registered_factory('var')
-Wbr = registered_factory('wbr')
-Area = registered_factory('area')
-Audio = registered_factory('audio')
-Img = registered_factory('img')
-Map = registered_factory('map')
-Track = registered_factory('track')
-Video = registered_factory('video')
-Embed = registered_factory('embed')
-Iframe = registered_factory('iframe')
-Object = registered_factory('object')
-Param = registered_factory('param')
-Picture = registered_factory('picture')
-Source = registered_factory('source')
-Canvas = registered_factory('canvas')
-Noscript = registered_factory('noscript')
-Script = registered_factory('script')
-Del = registered_factory('del')
-Ins = registered_factory('ins')
-Caption = registered_factory('caption')
-Col = registered_factory('col')
-Colgroup = registered_factory('colgroup')
-Table = registered_factory('table')
-Tbody = registered_factory('tbody')
-Td = registered_factory('td')
-Tfoot = registered_factory('tfoot')
-Th = registered_factory('th')
-Thead = registered_factory('thead')
-Tr = registered_factory('tr')
-Button = registered_factory('button')
-Datalist = registered_factory('datalist')
-Fieldset = registered_factory('fieldset')
-Form = registered_factory('form')
-Input = registered_factory('input')
-Label = registered_factory('label')
-Legend = registered_factory('legend')
-Meter = registered_factory('meter')
-Optgroup = registered_factory('optgroup')
-Option = registered_factory('option')
-Output = registered_factory('output')
-Progress = registered_factory('progress')
-Select = registered_factory('select')
-Textarea = registered_factory('textarea')
-Details = registered_factory('details')
-Dialog = registered_factory('dialog')
-Menu = registered_factory('menu')
-Summary = registered_factory('summary')
-Slot = registered_factory('slot')
-Template = registered_factory('template')
+ELEMENTS = [
+	'html',
+	'body',
+	'base',
+	'head',
+	'link',
+	'meta',
+	'style',
+	'title',
+	'address',
+	'article',
+	'aside',
+	'footer',
+	'header',
+	'h1',
+	'h2',
+	'h3',
+	'h4',
+	'h5',
+	'h6',
+	'hgroup',
+	'main',
+	'nav',
+	'section',
+	'blockquote',
+	'dd',
+	'div',
+	'dl',
+	'dt',
+	'figcaption',
+	'figure',
+	'hr',
+	'li',
+	'ol',
+	'p',
+	'pre',
+	'ul',
+	'a',
+	'abbr',
+	'b',
+	'bdi',
+	'bdo',
+	'br',
+	'cite',
+	'code',
+	'data',
+	'dfn',
+	'em',
+	'i',
+	'kbd',
+	'mark',
+	'q',
+	'rb',
+	'rp',
+	'rt',
+	'rtc',
+	'ruby',
+	's',
+	'samp',
+	'small',
+	'span',
+	'strong',
+	'sub',
+	'sup',
+	'time',
+	'u',
+	'var',
+	'wbr',
+	'area',
+	'audio',
+	'img',
+	'map',
+	'track',
+	'video',
+	'embed',
+	'iframe',
+	'object',
+	'param',
+	'picture',
+	'source',
+	'canvas',
+	'noscript',
+	'script',
+	'del',
+	'ins',
+	'caption',
+	'col',
+	'colgroup',
+	'table',
+	'tbody',
+	'td',
+	'tfoot',
+	'th',
+	'thead',
+	'tr',
+	'button',
+	'datalist',
+	'fieldset',
+	'form',
+	'input',
+	'label',
+	'legend',
+	'meter',
+	'optgroup',
+	'option',
+	'output',
+	'progress',
+	'select',
+	'textarea',
+	'details',
+	'dialog',
+	'menu',
+	'summary',
+	'slot',
+	'template',
+]
+
+# Class name -> element name
+_element_names = {element_name.title(): element_name for element_name in ELEMENTS}
+__all__ = list(_element_names)
+
+_lock = threading.Lock()
+
+def __getattr__(name):
+	'''
+	Create each element class on first use (see PEP 562).
+	Creating them all takes a noticeable part of our import time.
+	'''
+	try :
+		element_name = _element_names[name]
+	except KeyError :
+		raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+	with _lock :
+		# Another thread may have just created it
+		cls = globals().get(name)
+		if cls is None :
+			cls = globals()[name] = element_class(element_name)
+	return cls
+
+def __dir__():
+	return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,74 @@
+import codecs
+from typing import AsyncIterator, Callable, Iterator, Optional, Union
+from ._base import Content, agenerate_child_html, generate_child_html
+
+def incremental_encoder(encoding: Optional[str]) -> Optional[Callable[..., bytes]]:
+	'''
+	Return an encode(str, final=False) function, or None if encoding is None.
+
+	Encoding chunk by chunk with str.encode() would write a BOM in front of 
+	every chunk, for encodings that use one (ie. utf-16).
+	'''
+	if encoding is None :
+		return None
+	return codecs.getincrementalencoder(encoding)().encode
+
+def stream(
+	content: Content, 
+	chunk_size: int = 8192, 
+	encoding: Optional[str] = None,
+) -> Iterator[Union[str, bytes]]:
+	'''
+	Generate the html of content in chunks of (roughly) chunk_size characters.
+
+	Iterating an HTMLGenerator directly produces many tiny strings. When
+	streaming a response, each of those would be sent (and encoded)
+	separately. Pass stream(your_document) to StreamingHttpResponse instead.
+
+	If encoding is given, we generate bytes rather than str.
+	Each chunk is at least chunk_size characters (except the last), and
+	generally not much more.
+	'''
+	encode = incremental_encoder(encoding)
+	buffer = []
+	size = 0
+	for html in generate_child_html(content) :
+		buffer.append(html)
+		size += len(html)
+		if size >= chunk_size :
+			chunk = ''.join(buffer)
+			buffer.clear()
+			size = 0
+			yield encode(chunk) if encode else chunk
+	chunk = ''.join(buffer)
+	if encode :
+		chunk = encode(chunk, True)
+	if chunk :
+		yield chunk
+
+async def astream(
+	content: Content, 
+	chunk_size: int = 8192, 
+	encoding: Optional[str] = None,
+) -> AsyncIterator[Union[str, bytes]]:
+	'''
+	Like stream(), but asynchronous (see HTMLGenerator.__aiter__).
+
+	Pass the result to StreamingHttpResponse when serving via ASGI.
+	'''
+	encode = incremental_encoder(encoding)
+	buffer = []
+	size = 0
+	async for html in agenerate_child_html(content) :
+		buffer.append(html)
+		size += len(html)
+		if size >= chunk_size :
+			chunk = ''.join(buffer)
+			buffer.clear()
+			size = 0
+			yield encode(chunk) if encode else chunk
+	chunk = ''.join(buffer)
+	if encode :
+		chunk = encode(chunk, True)
+	if chunk :
+		yield chunk
@@ -1,22 +1,98 @@
+import functools
 import re
-from ._base import HTMLGenerator, escape
+import string
+from ._base import HTMLGenerator, render_child_html
 from ._fragment import Fragment
 
+'''
+Shared by template() and format().
+
+Templates are (escaped) strs, which are usually translated strings, reused
+for many renders. So we split each template into "segments" only once, and
+cache the result. Each segment is either a literal str, or a tuple
+describing a placeholder. Rendering is then a single join.
+'''
+
+# Backward compatibility. Handle {{pattern}}.
+# TODO - drop this in v3.
+# Also handle {pattern}. xgettext will identify these as python-brace-format strings, which is very helpful to ensure proper translation.
+_PLACEHOLDER = re.compile(r'{{([a-zA-Z0-9_]+)}}|{([a-zA-Z0-9_]+)}')
+
+@functools.lru_cache(maxsize=1024)
+def parse_template(template):
+    '''
+    Split a template() template into literal strs and (name, placeholder) tuples.
+    placeholder is the original text, including braces.
+    '''
+    segments = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(template) :
+        if match.start() > position :
+            segments.append(template[position:match.start()])
+        segments.append((match.group(1) or match.group(2), match.group()))
+        position = match.end()
+    if position < len(template) :
+        segments.append(template[position:])
+    return tuple(segments)
+
+_formatter = string.Formatter()
+
+@functools.lru_cache(maxsize=1024)
+def parse_format(template):
+    '''
+    Split a str.format() template into literal strs and (field_name, conversion, format_spec) tuples.
+    '''
+    segments = []
+    for literal, field_name, format_spec, conversion in _formatter.parse(template) :
+        if literal :
+            segments.append(literal)
+        if field_name is not None :
+            segments.append((field_name, conversion, format_spec))
+    return tuple(segments)
+
+def substitute(segments, replace):
+    '''
+    Join segments, calling replace(segment) for each placeholder segment.
+    '''
+    return ''.join([
+        segment if segment.__class__ is str else replace(segment)
+        for segment in segments
+    ])
+
+def format_segments(segments, values):
+    '''
+    Equivalent to template.format(**values), where segments = parse_format(template)
+    '''
+    def replace(segment):
+        field_name, conversion, format_spec = segment
+        value, _ = _formatter.get_field(field_name, (), values)
+        value = _formatter.convert_field(value, conversion)
+        # Format specs may contain nested fields
+        if '{' in format_spec :
+            format_spec = format_segments(parse_format(format_spec), values)
+        return _formatter.format_field(value, format_spec)
+    return substitute(segments, replace)
+
 class _LazyString:
     '''
-    Intended to wrap an HTMLGenerator, stringify it lazily and only once, even if used as a string multiple times.
+    Intended to wrap content, stringify it lazily and only once, even if used as a string multiple times.
 
     In case source is a "one-shot" generator.
 
-    TODO - export this? Could be useful elsewhere
+    Much lighter than Memo (no lock, and no copying of the parts), since
+    template() only ever needs the whole string.
     '''
+    __slots__ = ('source', 'string')
     def __init__(self, source):
         self.source = source
         self.string = None
 
     def __str__(self):
         if self.string is None :
-            self.string = str(self.source)
+            out = []
+            render_child_html(self.source, out)
+            self.string = ''.join(out)
+            self.source = None
         return self.string
 
 class template(HTMLGenerator):
@@ -48,32 +124,32 @@ class template(HTMLGenerator):
     # xgettext:python-brace-format
     (but xgettext usually identifies them properly)
     '''
+    __slots__ = ('template', 'context')
     def __init__(self, template, **context):
         self.template = template
 
         # Stringify (and escape) context lazily, and only once
         # Values could be "one-shot" generators, but they should produce same result if used multiple times in template
         self.context = {
-            key: _LazyString(Fragment(value))
+            key: _LazyString(value)
             for key, value in context.items()
         }
 
-    def __iter__(self):
+    def _render_parts(self):
         # escape template, unless it's already a "safe" object
         template = str(Fragment(self.template))
+        context = self.context
 
-        def get_replacement(match):
+        def replace(segment):
+            name, placeholder = segment
             try :
-                value = self.context[match.group(1)]
+                value = context[name]
             except KeyError :
-                # Return the entire match, including wrapping braces
-                return match.group()
+                # Leave the entire placeholder, including wrapping braces
+                return placeholder
             else :
                 return str(value)
 
-        # Backward compatibility. Handle {{pattern}}.
-        # TODO - drop this in v3.
-        template = re.sub(r'{{([a-zA-Z0-9_]+)}}', get_replacement, template)
-        # Replace {pattern}. xgettext will identify these as python-brace-format strings, which is very helpful to ensure proper translation.
-        template = re.sub(r'{([a-zA-Z0-9_]+)}', get_replacement, template)
-        yield template
+        return substitute(parse_template(template), replace), (), ''
+    def _render_into(self, out):
+        out.append(self._render_parts()[0])
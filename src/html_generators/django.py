@@ -14,15 +14,24 @@ this entire module with a convenient alias:
 import html_generators.django as hd
 '''
 from ._base import HTMLGenerator
+from ._cached import CacheBackend, Cached
 import datetime
+import hashlib
+import threading
+import weakref
 from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.utils import make_template_fragment_key
+from django.core.signals import request_finished
 from django.templatetags.static import static
 from django.template.defaultfilters import date as _date
 from django.template.loader import render_to_string
 from django.utils.timezone import is_naive, get_current_timezone
 
 __all__ = [
-	'date', 'static', 'Template',
+	'Cache', 'cache_fragment', 'CachedFragment', 'CachedTemplate', 'date', 
+	'static', 'Template',
 ]
 
 DEFAULT = object()
@@ -58,6 +67,7 @@ class Template(HTMLGenerator):
 	rendering all content "just in time", and this utility 
 	helps achieve that.
 	'''
+	__slots__ = ('template_name', 'request', 'context', 'using')
 	def __init__(self, template_name, request=None, context=None, using=None):
 		self.template_name = template_name
 		self.request = request
@@ -74,3 +84,150 @@ class Template(HTMLGenerator):
 
 # backward compatible alias
 DjangoTemplate = Template
+
+class Cache(CacheBackend):
+	'''
+	A backend for html_generators.Cached, which uses django's cache framework.
+
+	Ie:
+	product_cache = hd.Cache()
+	h.Cached(('product', product.id), lambda: product_card(product), ttl=600, backend=product_cache)
+
+	Cached keys are hashed (to meet memcached's key restrictions), so they
+	should be made of values with a stable repr() (str, int, tuples, etc.).
+	ttl is passed as the timeout (None means forever).
+	'''
+	def __init__(self, alias='default', key_prefix='html_generators.cached'):
+		self.alias = alias
+		self.key_prefix = key_prefix
+
+	def make_key(self, key):
+		return f'{self.key_prefix}.{hashlib.md5(repr(key).encode()).hexdigest()}'
+
+	def get(self, key):
+		return caches[self.alias].get(self.make_key(key))
+
+	def get_many(self, keys):
+		'''
+		Returns a dict of the keys that were found.
+		'''
+		made_keys = {self.make_key(key): key for key in keys}
+		found = caches[self.alias].get_many(list(made_keys))
+		return {made_keys[made_key]: html for made_key, html in found.items()}
+
+	def set(self, key, html, ttl):
+		caches[self.alias].set(self.make_key(key), html, ttl)
+
+class _FragmentCache(Cache):
+	'''
+	Uses the same keys as the {% cache %} template tag, so fragments can be
+	shared with templates, and invalidated the same way.
+	'''
+	def make_key(self, key):
+		fragment_name, vary_on = key
+		return make_template_fragment_key(fragment_name, vary_on)
+
+_fragment_caches = {}
+def _fragment_cache(alias):
+	try :
+		return _fragment_caches[alias]
+	except KeyError :
+		return _fragment_caches.setdefault(alias, _FragmentCache(alias))
+
+# CachedFragments which have been created, but not yet looked up (per thread)
+# Weak, so fragments which are never rendered don't outlive their tree
+_unfetched = threading.local()
+_NOT_FETCHED = object()
+
+def _unfetched_fragments():
+	try :
+		return _unfetched.fragments
+	except AttributeError :
+		_unfetched.fragments = weakref.WeakSet()
+		return _unfetched.fragments
+
+def _forget_unfetched(**kwargs):
+	'''
+	Don't batch fragments from one request with the next request's.
+	'''
+	_unfetched.fragments = weakref.WeakSet()
+request_finished.connect(_forget_unfetched)
+
+class CachedFragment(Cached):
+	'''
+	Like the {% cache %} template tag - render factory() only if this
+	fragment is not already in django's cache. Create with cache_fragment().
+
+	Cache lookups are batched: when the first fragment is rendered, we look
+	up every fragment (for the same cache alias) which has been created in 
+	this thread but not yet looked up, with a single cache.get_many(). So 
+	if you create many fragments before rendering (ie. in a list, rather 
+	than in a generator expression), they only cost one cache round trip.
+
+	Fragments are forgotten once they are garbage collected, or when the
+	current django request finishes, so a batch never includes fragments
+	from an earlier request.
+	'''
+	__slots__ = ('_prefetched', '__weakref__')
+	def __init__(self, fragment_name, factory, vary_on=(), timeout=DEFAULT_TIMEOUT, alias='default'):
+		# make_template_fragment_key() only uses str() of each value,
+		# and this way unhashable values (ie. lists) can still be keys
+		super().__init__(
+			(fragment_name, tuple(str(value) for value in vary_on)), factory, 
+			ttl=timeout, backend=_fragment_cache(alias),
+		)
+		self._prefetched = _NOT_FETCHED
+		_unfetched_fragments().add(self)
+
+	def _lookup(self):
+		if self._prefetched is _NOT_FETCHED :
+			self._prefetch()
+		# Rendering again looks up again
+		html, self._prefetched = self._prefetched, _NOT_FETCHED
+		return html
+
+	def _prefetch(self):
+		backend = self._backend
+		fragments = _unfetched_fragments()
+		fragments.discard(self)
+		batch = [self]
+		for fragment in list(fragments) :
+			if fragment._backend is backend :
+				batch.append(fragment)
+				fragments.discard(fragment)
+		found = backend.get_many({fragment._key for fragment in batch})
+		for fragment in batch :
+			fragment._prefetched = found.get(fragment._key)
+
+def cache_fragment(fragment_name, factory, vary_on=(), timeout=DEFAULT_TIMEOUT, alias='default'):
+	'''
+	The equivalent of:
+	{% cache timeout fragment_name vary_on... using=alias %}
+		{{ factory() }}
+	{% endcache %}
+
+	Ie:
+	hd.cache_fragment('sidebar', lambda: sidebar(request.user), vary_on=[request.user.username], timeout=500)
+
+	Keys are compatible with the {% cache %} tag, so you can invalidate them
+	with django.core.cache.utils.make_template_fragment_key(). timeout
+	defaults to the cache's default timeout (None means forever).
+	'''
+	return CachedFragment(fragment_name, factory, vary_on, timeout, alias)
+
+class CachedTemplate(CachedFragment):
+	'''
+	A Template, rendered inside cache_fragment().
+
+	fragment_name defaults to template_name.
+	'''
+	__slots__ = ()
+	def __init__(
+		self, template_name, request=None, context=None, using=None, 
+		vary_on=(), timeout=DEFAULT_TIMEOUT, fragment_name=None, alias='default',
+	):
+		super().__init__(
+			fragment_name or template_name, 
+			lambda: Template(template_name, request, context, using),
+			vary_on, timeout, alias,
+		)
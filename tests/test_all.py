@@ -1,3 +1,5 @@
 from . import test_basic
 from . import test_django
 from . import test_markupsafe
+from . import test_async
+from . import test_import
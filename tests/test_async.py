@@ -0,0 +1,113 @@
+import asyncio
+import html_generators as h
+def assert_equal(a, b):
+    assert a == b, f'This:\n{a}\nIs not equal to:\n{b}'
+
+async def slow_value(value):
+    await asyncio.sleep(0)
+    return value
+
+async def slow_rows(n):
+    for i in range(n) :
+        await asyncio.sleep(0)
+        yield h.Tr(h.Td(i), h.Td(slow_value(f'<{i}>')))
+
+async def main():
+    # Coroutines and async generators may appear anywhere in the tree
+    assert_equal(
+        await h.Table(slow_rows(2), class_='t').arender(),
+        '<table class="t"><tr><td>0</td><td>&lt;0&gt;</td></tr><tr><td>1</td><td>&lt;1&gt;</td></tr></table>',
+    )
+    # Awaitables may resolve to any content
+    assert_equal(await h.Div(slow_value([h.I('a'), None, 'b'])).arender(), '<div><i>a</i>b</div>')
+    # Futures/tasks, too
+    task = asyncio.ensure_future(slow_value('task'))
+    assert_equal(await h.P(task).arender(), '<p>task</p>')
+
+    # __aiter__ streams in document order
+    parts = []
+    async for html in h.Div(h.B('x'), slow_value(1)) :
+        parts.append(html)
+    assert_equal(parts, ['<div>', '<b>', 'x', '</b>', '1', '</div>'])
+
+    # astream produces (optionally encoded) chunks
+    chunks = [chunk async for chunk in h.astream(h.Ul(h.Li(i) for i in range(50)), chunk_size=40, encoding='utf-8')]
+    assert len(chunks) > 1
+    assert_equal(b''.join(chunks), str(h.Ul(h.Li(i) for i in range(50))).encode())
+
+asyncio.run(main())
+
+# Parallel starts all awaitable children at once, but renders in order
+async def sleep_then(seconds, value):
+    await asyncio.sleep(seconds)
+    return value
+async def parallel():
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    parts = []
+    async for html in h.Div(h.Parallel(sleep_then(0.2, 'a'), h.B('b'), sleep_then(0.1, 'c'), sleep_then(0.2, 'd'))) :
+        parts.append((html, loop.time() - start))
+    assert_equal(''.join(html for html, _ in parts), '<div>a<b>b</b>cd</div>')
+    # Slowest child, not the sum
+    assert parts[-1][1] < 0.4, parts
+    # The first child was emitted before the last one was ready
+    assert parts[0][1] < 0.05 and parts[1][1] < 0.3, parts
+asyncio.run(parallel())
+
+# Cached factories may return async content
+async def cached():
+    cache = h.LRUCache()
+    for _ in range(2) :
+        assert_equal(await h.Cached('k', lambda: h.P(slow_value(1)), backend=cache).arender(), '<p>1</p>')
+    assert_equal((cache.hits, cache.misses), (1, 1))
+asyncio.run(cached())
+
+# Memo records async renders too
+async def memo():
+    nav = h.Memo(h.Ul(slow_rows(3)))
+    first = await h.Div(nav).arender()
+    assert_equal(await h.Div(nav).arender(), first)
+    assert_equal(str(h.Div(nav)), first)
+    async def failing_rows():
+        yield 1
+        raise ValueError('failed')
+    failed = h.Memo(failing_rows())
+    for _ in range(2) :
+        try :
+            await failed.arender()
+        except ValueError :
+            pass
+        else :
+            raise AssertionError('Memo should re-raise the first error')
+asyncio.run(memo())
+
+# Deferred content may be async
+async def deferred():
+    html = await h.Document(h.Deferred(lambda: h.P(slow_value('slow')), placeholder='...'), h.P('fast')).arender()
+    assert html.index('fast') < html.index('slow'), html
+asyncio.run(deferred())
+
+# Subclasses which override __iter__/__aiter__ can extend the usual html
+class Commented(h.Element):
+    def __iter__(self):
+        yield '<!--x-->'
+        yield from super().__iter__()
+    async def __aiter__(self):
+        yield '<!--async-->'
+        async for html in super().__aiter__() :
+            yield html
+async def commented():
+    assert_equal(await h.P(Commented('div', slow_value('a'))).arender(), '<p><!--async--><div>a</div></p>')
+    assert_equal(await h.P(Commented('div', 'a')).arender(), str(h.P(Commented('div', 'a'))).replace('x', 'async'))
+asyncio.run(commented())
+
+# Synchronous rendering refuses async content, rather than rendering garbage
+for content in [slow_value(1), slow_rows(1)] :
+    try :
+        str(h.Div(content))
+    except TypeError :
+        pass
+    else :
+        raise AssertionError('Sync rendering should not accept async content')
+
+print('async tests passed.')
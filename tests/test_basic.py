@@ -44,6 +44,24 @@ assert_equal(str(h.Div(0, tabindex=0)), '<div tabindex="0">0</div>')
 assert_equal(str(h.Img(class_='a').with_classes('b')), '<img class="a b">')
 assert_equal(str(h.Div(h.I('a'), class_='a').with_classes('b')), '<div class="a b"><i>a</i></div>')
 assert_equal(str(h.Img(style='a: b').with_styles('b: c')), '<img style="a: b; b: c">')
+assert_equal(str(h.Script('a < b', type='module').with_attrs(type=None)), '<script>a < b</script>')
+assert_equal(str(h.Element('my-element', 'a', b=1).with_attrs(c=2)), '<my-element b="1" c="2">a</my-element>')
+# Chained clones share children, and merge classes/styles when rendered
+button = h.Button(h.I('icon'), class_='btn')
+clone = button.with_classes('large', None, False and 'x').with_attrs(type='button').with_classes('"primary"').with_styles('color: red', '')
+assert clone._children is button._children
+assert_equal(str(clone), '<button class="btn large &quot;primary&quot;" type="button" style="color: red"><i>icon</i></button>')
+assert_equal(str(button), '<button class="btn"><i>icon</i></button>')
+assert_equal(str(h.Div().with_classes(None)), '<div class=""></div>')
+assert_equal(str(h.Div(class_='a').with_classes('b').with_attrs(class_='c').with_classes('d')), '<div class="c d"></div>')
+
+# Standard elements are per-element classes
+assert type(h.Td('a').with_attrs(colspan=2)) is h.Td
+assert isinstance(h.Td(), h.Element)
+assert_equal(str(h.Td().open_tag()), '<td>')
+assert_equal(str(h.Td().close_tag()), '</td>')
+import pickle
+assert pickle.loads(pickle.dumps(h.Td)) is h.Td
 
 # Make sure generator expressions work
 assert_equal(str(h.Div(x for x in (1,2,3))), '<div>123</div>')
@@ -99,4 +117,483 @@ assert_equal(str(h.template('{a}', a=h.Br())), '<br>')
 
 assert_equal(str(h.format('<Please {link_start}click here{link_end}.', link_start=h.A(href='foo').open_tag(), link_end=h.A().close_tag())), '&lt;Please <a href="foo">click here</a>.')
 
+@h.compile
+def compiled_page(title, *content, body_class=None):
+    return h.Document(
+        h.Head(h.Title(title), h.Meta(charset='utf-8')),
+        h.Body(h.Nav(h.A('Home', href='/')), content, class_=body_class),
+    )
+assert_equal(str(compiled_page('<T>', h.P('a'), 'b')), '''<!DOCTYPE html>
+<head><title>&lt;T&gt;</title><meta charset="utf-8"></head><body><nav><a href="/">Home</a></nav><p>a</p>b</body>''')
+# Compiled once, rendered many times. Attribute arguments behave normally.
+assert_equal(
+    str(compiled_page('T', (x for x in [1, 2]), body_class='a"b')),
+    str(h.Document(
+        h.Head(h.Title('T'), h.Meta(charset='utf-8')),
+        h.Body(h.Nav(h.A('Home', href='/')), 1, 2, class_='a"b'),
+    )),
+)
+assert_equal(str(compiled_page('T', body_class=True)).count('<body class>'), 1)
+@h.compile
+def compiled_link(path, label):
+    return h.A(label, href=f'/books/{path}/')
+assert_equal(str(compiled_link('<1>', 'One')), '<a href="/books/&lt;1&gt;/">One</a>')
+# Arguments in <script>/<style> aren't escaped, just like when not compiled
+def data_script(data, label):
+    return h.Div(h.Script('var x="', data, '";', type='application/json'), h.Style(label), data_label=label)
+compiled_script = h.compile(data_script)
+for args in [('{"a": "<b>"}', 'a"b'), (1, True)] :
+    assert_equal(str(compiled_script(*args)), str(data_script(*args)))
+try :
+    h.compile(lambda user: user and h.Div())(None)
+except TypeError :
+    pass
+else :
+    raise AssertionError('compiled components should not test their arguments')
+# Nor iterate over them (which would otherwise render the placeholder)
+for iterating in [
+    lambda items: h.Ul(h.Join(', ', items)),
+    lambda rows: h.Tbody(h.Rows(rows)),
+    lambda rows: h.Table.from_rows(rows),
+] :
+    try :
+        str(h.compile(iterating)([['a', 'b']]))
+    except TypeError :
+        pass
+    else :
+        raise AssertionError('compiled components should not iterate over their arguments')
+# Comments aren't escaped, either
+assert_equal(str(h.compile(lambda x: h.Div(h.Comment(x)))(h.B('x'))), '<div><!--<b>x</b>--></div>')
+
+# Deep trees don't hit the recursion limit, whether rendered or streamed
+import sys
+deep = 'leaf'
+for _ in range(sys.getrecursionlimit() * 2) :
+    deep = h.Div(deep)
+deep_html = str(deep)
+assert deep_html.startswith('<div><div>') and deep_html.endswith('</div></div>')
+assert_equal(''.join(iter(deep)), deep_html)
+
+# Iterating still streams, in document order
+streamed = iter(h.Div(h.P('a'), (h.I(x) for x in range(2))))
+assert_equal(next(streamed), '<div>')
+assert_equal(list(streamed), ['<p>', 'a', '</p>', '<i>', '0', '</i>', '<i>', '1', '</i>', '</div>'])
+
+# Third-party HTMLGenerators which implement __iter__ still work
+from html_generators._base import HTMLGenerator
+class Custom(HTMLGenerator):
+    def __iter__(self):
+        yield '<custom>'
+        yield from h.B('&')
+        yield '</custom>'
+assert_equal(str(h.Div(Custom())), '<div><custom><b>&amp;</b></custom></div>')
+# Subclasses which override __iter__ can extend the usual html
+class Commented(h.Element):
+    def __iter__(self):
+        yield '<!--x-->'
+        yield from super().__iter__()
+class CommentedFragment(h.Fragment):
+    def __iter__(self):
+        yield from super().__iter__()
+        yield '<!--y-->'
+assert_equal(str(h.P(Commented('div', 'a', h.I('<')))), '<p><!--x--><div>a<i>&lt;</i></div></p>')
+assert_equal(''.join(Commented('br')), '<!--x--><br></br>')
+assert_equal(str(CommentedFragment('a', Commented('i'))), 'a<!--x--><i></i><!--y-->')
+
+# Common types (and registered types) are rendered via a per-type lookup
+import datetime, decimal
+assert_equal(
+    str(h.P(1, 2.5, decimal.Decimal('3.10'), datetime.date(2020, 1, 2), True, False, None)),
+    '<p>12.53.102020-01-02True</p>',
+)
+class Money:
+    def __init__(self, amount):
+        self.amount = amount
+h.register_content_type(Money, lambda m: h.Span('$', m.amount, class_='money'))
+assert_equal(str(h.P(Money(5), [Money(6)])), '<p><span class="money">$5</span><span class="money">$6</span></p>')
+class IntWithMarkup(int):
+    def __str__(self):
+        return '<int>'
+assert_equal(str(h.P(IntWithMarkup(1))), '<p>&lt;int&gt;</p>')
+
+# Streaming in chunks
+chunks = list(h.stream(h.Div(h.P(x) for x in range(100)), chunk_size=100))
+assert all(len(chunk) >= 100 for chunk in chunks[:-1])
+assert all(len(chunk) < 110 for chunk in chunks)
+assert_equal(''.join(chunks), str(h.Div(h.P(x) for x in range(100))))
+assert_equal(list(h.stream(h.P('é'), encoding='utf-8')), ['<p>é</p>'.encode('utf-8')])
+assert_equal(list(h.stream(None)), [])
+
+# Cached fragments
+cache = h.LRUCache(maxsize=2)
+calls = []
+def nav(user):
+    calls.append(user)
+    return h.Nav(h.A(user, href='/profile/'))
+for _ in range(3) :
+    assert_equal(
+        str(h.Div(h.Cached(('nav', 'bob'), lambda: nav('bob'), backend=cache))),
+        '<div><nav><a href="/profile/">bob</a></nav></div>',
+    )
+assert_equal(calls, ['bob'])
+assert_equal((cache.hits, cache.misses), (2, 1))
+# Least recently used items are evicted
+str(h.Cached('a', lambda: 'A', backend=cache))
+str(h.Cached('b', lambda: 'B', backend=cache))
+assert_equal(str(h.Cached(('nav', 'bob'), lambda: nav('bob'), backend=cache)), '<nav><a href="/profile/">bob</a></nav>')
+assert_equal(calls, ['bob', 'bob'])
+# Expired items are re-rendered
+str(h.Cached('expired', lambda: 'old', ttl=0, backend=cache))
+assert_equal(str(h.Cached('expired', lambda: 'new', ttl=0, backend=cache)), 'new')
+# Misses stream as usual, and are only stored once complete
+streamed = iter(h.Cached('streamed', lambda: h.P('x'), backend=cache))
+assert_equal(next(streamed), '<p>')
+assert cache.get('streamed') is None
+assert_equal(list(streamed), ['x', '</p>'])
+assert_equal(cache.get('streamed'), '<p>x</p>')
+# Default backend
+assert_equal(str(h.Cached('default', lambda: h.Br())), '<br>')
+assert_equal(h.default_cache.get('default'), '<br>')
+# Empty (falsy) backends are still used
+class SizedCache(h.LRUCache):
+    def __len__(self):
+        return len(self._items)
+sized = SizedCache()
+str(h.Cached('sized', lambda: 'S', backend=sized))
+assert_equal((sized.get('sized'), h.default_cache.get('sized')), ('S', None))
+
+# Attribute values of all types
+assert_equal(
+    str(h.Td(data_int=1, data_float=1.5, data_str='"<>"', data_html=h.B('&'), data_true=True, data_false=False, data_none=None)),
+    '<td data-int="1" data-float="1.5" data-str="&quot;&lt;&gt;&quot;" data-html="&lt;b&gt;&amp;amp;&lt;/b&gt;" data-true></td>',
+)
+assert_equal(str(h.Td(data_int=IntWithMarkup(1))), '<td data-int="&lt;int&gt;"></td>')
+# Normalized names are cached, and still correct the second time
+assert_equal(str(h.Td(aria_label_='x')), str(h.Td(aria_label_='x')))
+assert_equal(str(h.Td(aria_label_='x')), '<td aria-label="x"></td>')
+
+# Nodes don't carry a __dict__
+for node in [h.Div(), h.Br(), h.Script(), h.Fragment(), h.Join('', ()), h.MarkSafe(''), h.Comment(''), h.Document(), h.template('')] :
+    assert not hasattr(node, '__dict__'), type(node)
+
+# Our escape matches html.escape exactly, and doesn't copy clean strings
+import html
+from html_generators._escape import escape
+for text in ['', 'plain', '&<>"\'', '&#34;&#39;"\'', 'a & b', "it's", '<a href="x">']:
+    assert_equal(escape(text), html.escape(text))
+clean = 'nothing to see here ' * 10
+assert escape(clean) is clean
+
+# Parsed templates are cached, and reused
+from html_generators._template import parse_template
+hits = parse_template.cache_info().hits
+for _ in range(3) :
+    assert_equal(str(h.template('{a} and {{b}} and {c}', a=1, b=h.Br())), '1 and <br> and {c}')
+assert_equal(parse_template.cache_info().hits, hits + 2)
+# Substituted values are never treated as placeholders themselves
+assert_equal(str(h.template('{{a}}{b}', a='{b}', b='B')), '{b}B')
+
+# format() supports everything str.format() does
+assert_equal(str(h.format('{{{a!r}}} {a:4}| {a:{fill}^{width}}', a='x', fill='*', width=5)), "{'x'} x   | **x**")
+try :
+    h.format('{missing}')
+except KeyError :
+    pass
+else :
+    raise AssertionError('format() should raise KeyError for missing params')
+
+# Rendering to bytes/files
+import io, socket, tempfile, os
+def big_doc():
+    return h.Document(h.Title('Big é'), h.Ul(h.Li(i, '<é>') for i in range(3000)))
+expected = str(big_doc())
+assert_equal(big_doc().render_bytes(), expected.encode('utf-8'))
+assert_equal(big_doc().render_bytes('latin-1'), expected.encode('latin-1'))
+# Encodings with a BOM only write it once
+assert_equal(big_doc().render_bytes('utf-16'), expected.encode('utf-16'))
+assert_equal(b''.join(h.stream(big_doc(), chunk_size=10, encoding='utf-16')), expected.encode('utf-16'))
+text_file = io.StringIO()
+big_doc().write_to(text_file)
+assert_equal(text_file.getvalue(), expected)
+binary_file = io.BytesIO()
+big_doc().write_to(binary_file, encoding='utf-16', buffer_size=100)
+assert_equal(binary_file.getvalue().decode('utf-16'), expected)
+with tempfile.TemporaryDirectory() as directory :
+    path = os.path.join(directory, 'doc.html')
+    with open(path, 'wb') as f :
+        big_doc().write_to(f)
+    with open(path, encoding='utf-8') as f :
+        assert_equal(f.read(), expected)
+a, b = socket.socketpair()
+with a, b :
+    h.P('sent').write_to(a)
+    assert_equal(b.recv(100), b'<p>sent</p>')
+
+# Batch rendering
+# Worker processes must not re-import this (script-style) test module, so
+# only use a pool when processes are forked
+import multiprocessing
+workers = 2 if multiprocessing.get_start_method() == 'fork' else 1
+results = list(h.render_many(h.Fragment, [('<a>', 1), 'b', ('é',)], workers=workers))
+assert_equal([r.html for r in results], ['&lt;a&gt;1', 'b', 'é'])
+assert_equal([r.size for r in results], [10, 1, 2])
+assert_equal([r.index for r in results], [0, 1, 2])
+assert all(r.seconds >= 0 and r.path is None for r in results)
+with tempfile.TemporaryDirectory() as directory :
+    results = list(h.render_many(
+        h.Fragment, (('é', i) for i in range(10)), workers=workers,
+        out_dir=directory, filename=lambda index, args: f'pages/{args[1]}.html',
+    ))
+    assert_equal([r.path for r in results], [os.path.join(directory, 'pages', f'{i}.html') for i in range(10)])
+    with open(results[3].path, encoding='utf-8') as f :
+        assert_equal(f.read(), 'é3')
+    assert_equal(results[3].size, 3)
+
+# Profiling
+def profiled_item(i):
+    return h.Li(i, class_='item')
+def profiled_list():
+    return h.Ul(h.Join(h.Hr(), (profiled_item(i) for i in range(3))))
+with h.profile() as profile :
+    assert_equal(str(profiled_list()), '<ul><li class="item">0</li><hr><li class="item">1</li><hr><li class="item">2</li></ul>')
+    # Both sync walkers are instrumented
+    assert_equal(''.join(profiled_list()), str(profiled_list()))
+    try :
+        with h.profile() :
+            pass
+    except RuntimeError :
+        pass
+    else :
+        raise AssertionError('Only one profile may be active')
+assert_equal(profile.stats['li'].calls, 9)
+assert_equal(profile.stats['li'].strings, 9 * 3)
+assert_equal(profile.stats['ul'].bytes, 3 * len(str(profiled_list())))
+assert_equal(profile.stats['profiled_item()'].calls, 9)
+stacks = dict(line.rsplit(' ', 1) for line in profile.collapsed().splitlines())
+assert 'profiled_list();ul;Join;profiled_item();li' in stacks, stacks
+assert all(int(count) >= 0 for count in stacks.values())
+assert 'profiled_item()' in profile.summary()
+# Profiling is fully disabled afterwards
+assert_equal(str(profiled_list()).count('<li'), 3)
+assert_equal(profile.stats['li'].calls, 9)
+assert_equal(h.Element.__init__.__qualname__, 'Element.__init__')
+# Nesting is tracked per thread, so one thread's open div doesn't hide another's
+import threading
+with h.profile() as profile :
+    open_div = iter(h.Div('a'))
+    next(open_div)
+    other_thread = threading.Thread(target=lambda: str(h.Div('b')))
+    other_thread.start()
+    other_thread.join()
+    open_div.close()
+assert_equal(profile.stats['div'].strings, 3 + 1)
+
+# Memo
+nav = h.Memo(h.Ul(h.Li(i) for i in range(3)))
+assert_equal(str(h.Fragment(nav, nav)), '<ul><li>0</li><li>1</li><li>2</li></ul>' * 2)
+# The first render still streams
+items = iter(range(3))
+nav = h.Ul(h.Li(i) for i in items).materialize()
+stream = iter(nav)
+assert_equal([next(stream), next(stream)], ['<ul>', '<li>'])
+assert_equal(next(items), 1)
+# Abandoned renders are resumed by the next one
+nav = h.Ul(h.Li(i) for i in range(3)).materialize()
+stream = iter(nav)
+next(stream), next(stream)
+del stream
+assert_equal(str(nav), '<ul><li>0</li><li>1</li><li>2</li></ul>')
+assert_equal(str(nav), '<ul><li>0</li><li>1</li><li>2</li></ul>')
+# Renders can be interleaved
+nav = h.Memo(h.Li(i) for i in range(3))
+first, second = iter(nav), iter(nav)
+assert_equal(''.join(x + y for x, y in zip(first, second)), '<li><li>00</li></li><li><li>11</li></li><li><li>22</li></li>')
+# A failed first render isn't cached
+def failing_items():
+    yield h.Li(1)
+    raise ValueError('failed')
+nav = h.Memo(h.Ul(failing_items()))
+for _ in range(2) :
+    try :
+        str(nav)
+    except ValueError :
+        pass
+    else :
+        raise AssertionError('Memo should re-raise the first error')
+
+# Rows
+users = [dict(name='<a>', email='a@example.com', age=1), dict(name='b', email=None, age=2.5)]
+assert_equal(
+    str(h.Table.from_rows(users, columns=['name', lambda user: user['email'] and h.A(user['email']), 'age'], headers=['Name', 'Email', 'Age'], class_='users')),
+    '<table class="users"><thead><tr><th>Name</th><th>Email</th><th>Age</th></tr></thead><tbody>'
+    '<tr><td>&lt;a&gt;</td><td><a>a@example.com</a></td><td>1</td></tr>'
+    '<tr><td>b</td><td></td><td>2.5</td></tr>'
+    '</tbody></table>',
+)
+assert_equal(
+    str(h.Rows([('a', 1), ('b', 2)], cell_attrs=[dict(class_='name'), None])),
+    '<tr><td class="name">a</td><td>1</td></tr><tr><td class="name">b</td><td>2</td></tr>',
+)
+assert_equal(str(h.Rows([[0], []], cell_attrs=dict(data_x=1))), '<tr><td data-x="1">0</td></tr><tr></tr>')
+# Cells without attributes aren't dropped
+assert_equal(str(h.Rows([('a', 'b', 'c')], cell_attrs=[dict(class_='x')])), '<tr><td class="x">a</td><td>b</td><td>c</td></tr>')
+assert_equal(str(h.Rows([dict(a='A')], columns=['a'])), '<tr><td>A</td></tr>')
+# Same output as building elements, and streamed row by row
+rows = [(i, f'<{i}>', i / 2, None, True) for i in range(100)]
+assert_equal(str(h.Tbody(h.Rows(rows))), str(h.Tbody(h.Tr(h.Td(cell) for cell in row) for row in rows)))
+assert_equal(len(list(h.Rows(iter(rows)))), 100)
+
+# Diffing
+def dashboard(counts, title='Dashboard'):
+    return h.Main(
+        h.H1(title),
+        h.Section((h.P(name, ': ', h.Span(count, id=f'count-{name}')) for name, count in counts.items()), id='counts'),
+        h.Footer('Updated', id='footer'),
+    )
+diff = h.render_diff(None, dashboard(dict(a=1, b=2)))
+assert_equal(diff.patches, [(None, str(dashboard(dict(a=1, b=2))))])
+assert_equal(set(diff.hashes), {None, 'counts', 'count-a', 'count-b', 'footer'})
+# Nothing changed
+assert_equal(h.render_diff(diff.hashes, dashboard(dict(a=1, b=2))).patches, [])
+# Only the changed element is rendered
+assert_equal(h.render_diff(diff.hashes, dashboard(dict(a=1, b=3))).patches, [('count-b', '<span id="count-b">3</span>')])
+# Adding an element patches its parent, but not also the parent's children
+assert_equal(
+    h.render_diff(diff.hashes, dashboard(dict(a=5, b=2, c=3))).patches,
+    [('counts', str(dashboard(dict(a=5, b=2, c=3))._children[1]))],
+)
+# Changes outside of any keyed element re-render everything
+assert_equal(h.render_diff(diff.hashes, dashboard(dict(a=1, b=2), 'New')).patches, [(None, str(dashboard(dict(a=1, b=2), 'New')))])
+# old may also be a tree
+assert_equal(h.render_diff(dashboard(dict(a=1)), dashboard(dict(a=2))).patches, [('count-a', '<span id="count-a">2</span>')])
+try :
+    h.render_diff(None, h.Div(h.P(id='x'), h.P(id='x')))
+except ValueError :
+    pass
+else :
+    raise AssertionError('Duplicate ids should raise ValueError')
+
+# Deferred
+calls = []
+def slow_widget():
+    calls.append('widget')
+    return h.Div('slow', h.Deferred(lambda: h.B('nested')))
+page = h.Document(h.Body(
+    h.P('before'),
+    h.Deferred(slow_widget, placeholder=h.I('Loading...')),
+    h.P('after'),
+))
+stream = iter(page)
+streamed = ''
+while '<p>after</p>' not in streamed :
+    streamed += next(stream)
+# The rest of the document was streamed before the factory was called
+assert_equal(calls, [])
+assert_equal(streamed, '<!DOCTYPE html>\n<body><p>before</p><hg-deferred id="hg-deferred-0" style="display:contents"><i>Loading...</i></hg-deferred><p>after</p>')
+rest = ''.join(stream)
+assert_equal(calls, ['widget'])
+assert rest.startswith('<script>function hgDeferredSwap(id)'), rest
+assert rest.endswith(
+    '<template id="hg-deferred-0-content"><div>slow<hg-deferred id="hg-deferred-1" style="display:contents"></hg-deferred></div></template>'
+    '<script>hgDeferredSwap("hg-deferred-0")</script>'
+    '<template id="hg-deferred-1-content"><b>nested</b></template>'
+    '<script>hgDeferredSwap("hg-deferred-1")</script>'
+    '</body>'
+), rest
+# Without a Body/Document, content is rendered in place
+assert_equal(str(h.Div(h.Deferred(lambda: 'now', placeholder='later'))), '<div>now</div>')
+# Document collects anything outside of the body
+assert_equal(str(h.Document(h.Deferred(lambda: 'x'))).count('hgDeferredSwap("hg-deferred-0")'), 1)
+# Documents rendered while another is part way through are independent
+def deferred_page(name):
+    return h.Document(h.Body(h.P(name), h.Deferred(lambda: name)))
+expected = str(deferred_page('a'))
+stream = iter(deferred_page('a'))
+first = next(stream) + next(stream)
+assert_equal(str(deferred_page('b')), expected.replace('<p>a</p>', '<p>b</p>').replace('>a<', '>b<'))
+assert_equal(first + ''.join(stream), expected)
+# Content which is rendered separately (and cached) renders Deferred in place
+cached_page = lambda: h.Document(h.Body(h.Cached('deferred', lambda: h.Deferred(lambda: 'real', placeholder='...'), backend=h.LRUCache())))
+assert_equal(str(cached_page()), '<!DOCTYPE html>\n<body>real</body>')
+memo = h.Memo(h.Deferred(lambda: 'real', placeholder='...'))
+assert_equal([str(h.Body(memo)), str(h.Body(memo))], ['<body>real</body>'] * 2)
+
+# Render limits
+import itertools
+def runaway():
+    return h.Html(h.Body(h.Ul(h.Li(i, 'é') for i in itertools.count())))
+def limit_error(content, **limits):
+    try :
+        ''.join(h.Limited(content, **limits))
+    except h.RenderLimitExceeded as e :
+        return e
+    raise AssertionError('Limit was not exceeded')
+error = limit_error(runaway(), max_bytes=1000)
+assert_equal((error.limit, error.value, error.path), ('max_bytes', 1000, ['html', 'body', 'ul', 'li']))
+assert 'html > body > ul > li' in str(error)
+assert_equal(limit_error(runaway(), max_nodes=10).path, ['html', 'body', 'ul'])
+assert_equal(limit_error(h.Div(h.Div(h.Div(h.Div('deep')))), max_depth=3).path, ['div', 'div', 'div', 'div'])
+assert_equal(limit_error(runaway(), timeout=0.01).limit, 'timeout')
+# The clock is checked on every step, so slow content stops promptly
+import time
+def slow_items():
+    for i in itertools.count():
+        time.sleep(0.01)
+        yield i
+started = time.monotonic()
+assert_equal(limit_error(h.Div(slow_items()), timeout=0.05).limit, 'timeout')
+assert time.monotonic() - started < 0.5
+# Even content which renders nothing
+assert_equal(limit_error(h.Div(None for _ in itertools.count()), timeout=0.05).limit, 'timeout')
+assert_equal(limit_error(h.Div(False for _ in itertools.count()), timeout=0.05).limit, 'timeout')
+# Limits count utf-8 bytes
+assert_equal(str(h.Limited(h.P('é'), max_bytes=9)), '<p>é</p>')
+assert_equal(limit_error(h.P('é'), max_bytes=8).limit, 'max_bytes')
+# Within limits, output is unchanged (and not escaped again)
+assert_equal(str(h.Div(h.Limited(h.P('<ok>'), max_nodes=1, max_depth=2, timeout=5))), '<div><p>&lt;ok&gt;</p></div>')
+
+# Instrumented renders share one walker, whose levels are always closed
+from html_generators._base import walk_child_html
+events = []
+walker = walk_child_html(
+    h.Div([h.B('a'), 1], h.I('b')),
+    on_open=lambda node: events.append(('open', node and type(node).__name__)) or len(events),
+    on_emit=lambda html: events.append(html),
+    on_close=lambda level: events.append(('close', level)),
+)
+assert_equal(''.join(walker), '<div><b>a</b>1<i>b</i></div>')
+assert_equal(events, [
+    ('open', 'Div'), '<div>', ('open', None), ('open', 'B'), '<b>', 'a', '</b>', ('close', 4),
+    '1', ('close', 3), ('open', 'I'), '<i>', 'b', '</i>', ('close', 11), '</div>', ('close', 1),
+])
+skipped = []
+assert_equal(''.join(walk_child_html(h.Div(None, [False, 'a']), on_skip=skipped.append)), '<div>a</div>')
+assert_equal(skipped, [None, False])
+events = []
+walker = walk_child_html(h.Div(h.B('a')), on_open=lambda node: node._name, on_close=events.append)
+assert_equal([next(walker), next(walker)], ['<div>', '<b>'])
+walker.close()
+assert_equal(events, ['b', 'div'])
+
+# Leaf nodes append their html directly, but stream the same html
+from html_generators._element import VoidElement
+leaves = lambda: h.Div(
+    h.Br(), h.Input(type='text', disabled=True), VoidElement('x-void', a=1),
+    h.MarkSafe('<b>safe</b>'), h.Comment('note'), h.Script('a < b', type='module'),
+    h.template('{a} & {b}', a=h.Hr(), b='<'),
+)
+assert_equal(
+    str(leaves()),
+    '<div><br><input type="text" disabled><x-void a="1"><b>safe</b><!--note-->'
+    '<script type="module">a < b</script><hr> &amp; &lt;</div>'
+)
+assert_equal(''.join(leaves()), str(leaves()))
+assert_equal(h.render_diff(None, h.Div(h.Input(id='q'))).hashes.keys(), {None, 'q'})
+# Third-party nodes may implement _render_into() (only used by non-streaming renders)
+class Star(h.MarkSafe):
+    def _render_into(self, out):
+        out.append('*')
+assert_equal(str(h.P(Star('+'))), '<p>*</p>')
+assert_equal(''.join(h.P(Star('+'))), '<p>+</p>')
+
 print('Basic tests passed.')
\ No newline at end of file
@@ -67,7 +67,26 @@ from itertools import count, islice
 infinite_doc = h.Document(h.Div(x) for x in count())
 bits = islice(StreamingHttpResponse(infinite_doc), 100)
 assert_equal(''.join(b.decode() for b in bits), '''<!DOCTYPE html>
-<div>0</div><div>1</div><div>2</div><div>3</div><div>4</div><div>5</div><div>6</div><div>7</div><div>8</div><div>9</div><div>10</div><div>11</div><div>12</div><div>13</div><div>14</div><div>15</div><div>16</div><div>17</div><div>18</div><div>19</div><div>20</div><div>21</div><div>22</div><div>23</div><div>24''')
+<div>0</div><div>1</div><div>2</div><div>3</div><div>4</div><div>5</div><div>6</div><div>7</div><div>8</div><div>9</div><div>10</div><div>11</div><div>12</div><div>13</div><div>14</div><div>15</div><div>16</div><div>17</div><div>18</div><div>19</div><div>20</div><div>21</div><div>22</div><div>23</div><div>24</div><div>25</div><div>26</div><div>27</div><div>28</div><div>29</div><div>30</div><div>31</div><div>32</div>''')
+
+# Chunked streaming response
+bits = islice(StreamingHttpResponse(h.stream(h.Document(h.Div(x) for x in count()), chunk_size=50)), 2)
+assert_equal(b''.join(bits), b'''<!DOCTYPE html>
+<div>0</div><div>1</div><div>2</div><div>3</div><div>4</div><div>5</div><div>6</div><div>''')
+
+# Async streaming response (async iterators are supported since Django 4.2)
+import asyncio
+if django.VERSION >= (4, 2) :
+    async def async_numbers():
+        for x in range(3) :
+            await asyncio.sleep(0)
+            yield h.Div(x)
+    async_response = StreamingHttpResponse(h.astream(h.Document(async_numbers())))
+    assert async_response.is_async
+    async def consume(response):
+        return b''.join([chunk async for chunk in response])
+    assert_equal(asyncio.run(consume(async_response)), b'''<!DOCTYPE html>
+<div>0</div><div>1</div><div>2</div>''')
 
 
 import datetime
@@ -96,5 +115,72 @@ assert_equal(hd.date(datetime.time(1,1,1), 'H'), '01')
 assert hd.static('foo.js') == '/static/foo.js'
 assert str(hd.Template('foo.html', context=dict(foo='FOO'))) == 'FOO'
 
+# Cached, using django's cache framework (locmem, by default)
+django_cache = hd.Cache()
+for _ in range(2) :
+    assert_equal(str(h.Cached(('footer', 1), lambda: h.Footer('<c>'), ttl=60, backend=django_cache)), '<footer>&lt;c&gt;</footer>')
+assert_equal((django_cache.hits, django_cache.misses), (1, 1))
+from django.core.cache import cache as default_django_cache
+assert_equal(default_django_cache.get(django_cache.make_key(('footer', 1))), '<footer>&lt;c&gt;</footer>')
+
+# Fragment caching, compatible with the {% cache %} tag
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import Template as DjangoTemplate, Context
+calls = []
+def sidebar(name):
+    calls.append(name)
+    return h.Aside('<', name)
+for _ in range(2) :
+    assert_equal(str(hd.cache_fragment('sidebar', lambda: sidebar('a'), vary_on=['a'], timeout=60)), '<aside>&lt;a</aside>')
+assert_equal(calls, ['a'])
+assert_equal(default_django_cache.get(make_template_fragment_key('sidebar', ['a'])), '<aside>&lt;a</aside>')
+assert_equal(
+    DjangoTemplate('{% load cache %}{% cache 60 sidebar name %}not rendered{% endcache %}').render(Context(dict(name='a'))),
+    '<aside>&lt;a</aside>',
+)
+default_django_cache.delete(make_template_fragment_key('sidebar', ['a']))
+assert_equal(str(hd.cache_fragment('sidebar', lambda: sidebar('b'), vary_on=['a'])), '<aside>&lt;b</aside>')
+# vary_on values needn't be hashable, and match {% cache %} keys
+from django.http import QueryDict
+query = QueryDict('page=2')
+assert_equal(str(hd.cache_fragment('sidebar', lambda: sidebar('c'), vary_on=[['a', 1], query])), '<aside>&lt;c</aside>')
+assert_equal(
+    DjangoTemplate('{% load cache %}{% cache 60 sidebar list query %}not rendered{% endcache %}').render(Context(dict(list=['a', 1], query=query))),
+    '<aside>&lt;c</aside>',
+)
+
+# Lookups for fragments created before rendering are batched
+get_many_calls = []
+original_get_many = type(caches['default']).get_many
+def counting_get_many(self, keys, *args, **kwargs):
+    get_many_calls.append(len(keys))
+    return original_get_many(self, keys, *args, **kwargs)
+type(caches['default']).get_many = counting_get_many
+try :
+    def rows():
+        return h.Ul(h.Join(' ', [
+            hd.cache_fragment('row', lambda i=i: h.Li(i), vary_on=[i]) for i in range(5)
+        ]))
+    assert_equal(str(rows()), '<ul><li>0</li> <li>1</li> <li>2</li> <li>3</li> <li>4</li></ul>')
+    assert_equal(str(rows()), '<ul><li>0</li> <li>1</li> <li>2</li> <li>3</li> <li>4</li></ul>')
+    assert_equal(get_many_calls, [5, 5])
+finally :
+    type(caches['default']).get_many = original_get_many
+# Fragments which are never rendered aren't kept, or batched with later requests
+from django.core.signals import request_finished
+from html_generators.django import _unfetched_fragments
+unrendered = [hd.cache_fragment('row', lambda: 'x', vary_on=[i]) for i in range(1000)]
+assert_equal(len(_unfetched_fragments()), 1000)
+del unrendered
+assert_equal(len(_unfetched_fragments()), 0)
+unrendered = [hd.cache_fragment('row', lambda: 'x', vary_on=[i]) for i in range(3)]
+request_finished.send(sender=None)
+assert_equal(len(_unfetched_fragments()), 0)
+
+# CachedTemplate
+for foo in ['FOO', 'BAR'] :
+    assert_equal(str(hd.CachedTemplate('foo.html', context=dict(foo=foo), timeout=60)), 'FOO')
+
 
 print('Django tests passed.')
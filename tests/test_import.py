@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+def assert_equal(a, b):
+    assert a == b, f'This:\n{a}\nIs not equal to:\n{b}'
+
+def import_times(code):
+    '''
+    Run code in a fresh interpreter, with -X importtime.
+    Returns {module name: self microseconds}.
+    '''
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines() :
+        if not line.startswith('import time:') or 'cumulative' in line :
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_time)
+    return times
+
+# Importing the package only imports the core modules.
+# Everything else (and the stdlib modules it needs) is imported on first use.
+times = import_times('import html_generators')
+assert 'html_generators' in times, times
+for module in [
+    'asyncio',
+    'concurrent.futures',
+    'multiprocessing',
+    'decimal',
+    'inspect',
+    'uuid',
+    'html_generators._batch',
+    'html_generators._compile',
+    'html_generators._parallel',
+    'html_generators._profile',
+    'html_generators._template',
+] :
+    assert module not in times, f'{module} was imported by "import html_generators"'
+
+# Guard against regressions in import time, relative to importing everything
+# (absolute times vary too much between machines)
+full_times = import_times('from html_generators import *')
+assert sum(times.values()) < sum(full_times.values()) / 2, (sum(times.values()), sum(full_times.values()))
+
+# Element classes are created on first use, and only once
+times = import_times('''
+import html_generators as h
+from html_generators import _standard_elements
+assert 'Td' not in vars(_standard_elements)
+assert h.Td is h.Td is _standard_elements.Td
+assert str(h.Td(h.template('{a}', a=h.Comment('b')))) == '<td><!--b--></td>'
+from html_generators import *
+assert Document is h.Document
+assert 'Tr' in dir(h) and 'Tr' in dir(_standard_elements)
+''')
+assert 'html_generators._template' in times, times
+
+try :
+    import html_generators as h
+    h.NotAnElement
+except AttributeError :
+    pass
+else :
+    raise AssertionError('Unknown attributes should raise AttributeError')
+
+print('import tests passed.')